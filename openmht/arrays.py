@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+"""NumPy interface for running MHT on in-memory detections."""
+
+import numpy as np
+
+from .mht import MHT
+
+__author__ = "Jon Perdomo"
+__license__ = "GPL-3.0"
+
+COORDINATE_FIELDS = ('u', 'v', 'w')
+
+
+def split_frames(detections):
+    """
+    Split detections into a list of per-frame coordinate arrays.
+    Detections are either a single (N, 1 + D) array of frame numbers followed by
+    coordinates, or a sequence of per-frame (N_i, D) coordinate arrays. Empty
+    frames may be given as empty lists.
+    Returns the list of coordinate arrays and the array of frame numbers.
+    """
+    if isinstance(detections, np.ndarray):
+        assert detections.ndim == 2 and detections.shape[1] > 1, \
+            "Detection array must have a frame column followed by coordinate columns."
+
+        # Group the rows by frame number, preserving the row order within each frame
+        frame_numbers = detections[:, 0]
+        order = np.argsort(frame_numbers, kind='stable')
+        frames, splits = np.unique(frame_numbers[order], return_index=True)
+        coordinates = np.asarray(detections[order, 1:], dtype=float)
+
+        return np.split(coordinates, splits[1:]), frames.astype(np.int64)
+
+    frames = [np.asarray(frame, dtype=float) for frame in detections]
+    dims = next((frame.shape[-1] for frame in frames if frame.size > 0), 2)
+    for index, frame in enumerate(frames):
+        if frame.size == 0:
+            frames[index] = frame.reshape(0, dims)
+
+        assert frames[index].ndim == 2, "Each frame must be an (N, D) coordinate array."
+
+    return frames, np.arange(len(frames))
+
+
+def run_arrays(detections, params):
+    """
+    Run MHT on detections given as arrays (see split_frames).
+    Returns a dense (tracks x frames x dims) array of track coordinates with NaN for
+    missed detections, the array of track IDs for the track axis (see
+    MHT.get_solution_track_ids) and the array of frame numbers for the frame axis.
+    """
+    frames, frame_numbers = split_frames(detections)
+    mht = MHT(frames, params)
+    mht.run()
+
+    # Look up the coordinates of the solution detection IDs directly
+    detection_ids = mht.get_solution_detections()
+    coordinates = mht.get_detection_coordinates()
+    tracks = coordinates[np.maximum(detection_ids, 0)]
+    tracks[detection_ids < 0] = np.nan
+
+    return tracks, mht.get_solution_track_ids().astype(np.int64), frame_numbers
+
+
+def solution_to_array(solution_coordinates, frame_count, dims):
+    """Convert the MHT.run() solution to a dense (tracks x frames x dims) array."""
+    tracks = np.full((len(solution_coordinates), frame_count, dims), np.nan)
+    for track_index, track_coordinates in enumerate(solution_coordinates):
+        frame_indices = [i for i, coordinate in enumerate(track_coordinates) if coordinate is not None]
+        if frame_indices:
+            tracks[track_index, frame_indices] = [track_coordinates[i] for i in frame_indices]
+
+    return tracks
+
+
+def array_to_solution(tracks):
+    """Convert a dense (tracks x frames x dims) array to the MHT.run() solution format."""
+    missed = np.isnan(tracks).any(axis=2)
+
+    return [[None if missed[i, j] else coordinate for j, coordinate in enumerate(track)]
+            for i, track in enumerate(tracks.tolist())]
+
+
+def to_records(tracks, frame_numbers=None, track_ids=None):
+    """
+    Convert a dense (tracks x frames x dims) array to a structured array with
+    fields frame, track and the coordinates (u, v and w), one row per track and
+    frame ordered by frame, in the same layout as the output CSV. The track field
+    is the track index unless track IDs are given.
+    """
+    track_count, frame_count, dims = tracks.shape
+    assert dims <= len(COORDINATE_FIELDS), f"Structured arrays support up to {len(COORDINATE_FIELDS)} dimensions."
+    if frame_numbers is None:
+        frame_numbers = np.arange(frame_count)
+
+    dtype = [('frame', np.int64), ('track', np.int64)] + [(name, float) for name in COORDINATE_FIELDS[:dims]]
+    records = np.empty(track_count * frame_count, dtype=dtype)
+    frame_index, track_index = np.divmod(np.arange(len(records)), max(track_count, 1))
+    records['frame'] = np.asarray(frame_numbers)[frame_index]
+    records['track'] = track_index if track_ids is None else np.asarray(track_ids)[track_index]
+    for dim, name in enumerate(COORDINATE_FIELDS[:dims]):
+        records[name] = tracks[:, :, dim].T.ravel()
+
+    return records
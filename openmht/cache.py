@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+"""On-disk cache of MHT results keyed by the input detections, parameters and package version."""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from pathlib import Path
+
+import numpy as np
+import pkg_resources
+
+from .mht import MHT
+
+__author__ = "Jon Perdomo"
+__license__ = "GPL-3.0"
+
+CACHE_DIR_ENV = "OPENMHT_CACHE_DIR"  # Environment variable for the cache location
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "openmht")
+DEFAULT_MAX_BYTES = 500 * 1000 * 1000
+CACHE_SUFFIX = ".json.gz"
+
+
+def package_version():
+    """Return the installed OpenMHT version, or 'unknown' when running from source."""
+    try:
+        return pkg_resources.require("openmht")[0].version
+    except pkg_resources.DistributionNotFound:
+        return "unknown"
+
+
+def cache_key(detections, params, version=None):
+    """
+    Hash the detections, the normalized parameters and the package version.
+    Returns the hexadecimal digest.
+    """
+    if version is None:
+        version = package_version()
+
+    digest = hashlib.sha256()
+    digest.update(f"openmht {version}\n".encode())
+
+    # Parameters are normalized to floats and sorted by key
+    normalized_params = {key: float(val) for key, val in params.items()}
+    digest.update(json.dumps(normalized_params, sort_keys=True).encode())
+
+    # Hash the coordinates of each frame along with the frame shape
+    for frame in detections:
+        coordinates = np.asarray(frame, dtype=np.float64)
+        digest.update(repr(coordinates.shape).encode())
+        digest.update(coordinates.tobytes())
+
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """On-disk cache of MHT solutions with size-based LRU eviction."""
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        if directory is None:
+            directory = os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+
+        self.__directory = Path(directory).expanduser()
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        self.__max_bytes = max_bytes
+
+    def __path(self, key):
+        return self.__directory / (key + CACHE_SUFFIX)
+
+    def get(self, key):
+        """Return the cached solution coordinates, or None if the key is not cached."""
+        path = self.__path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as cache_file:
+                solution_coordinates = json.load(cache_file)
+
+            # Mark the entry as recently used
+            os.utime(path)
+
+        except FileNotFoundError:
+            return None
+
+        except (OSError, EOFError, ValueError) as cache_error:
+            # Treat a corrupt or truncated entry as a miss and remove it
+            logging.warning("[cache] Removing unreadable entry %s: %s", path, cache_error)
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+            return None
+
+        return solution_coordinates
+
+    def put(self, key, solution_coordinates):
+        """Store the solution coordinates and evict the least recently used entries."""
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.__directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, 'wb') as temp_file:
+                with gzip.open(temp_file, 'wt', encoding='utf-8') as cache_file:
+                    json.dump(solution_coordinates, cache_file)
+
+            os.replace(temp_path, self.__path(key))
+
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+        self.__evict()
+
+    def __evict(self):
+        """Remove the least recently used entries until the cache fits in the maximum size."""
+        entries = []
+        for path in self.__directory.glob("*" + CACHE_SUFFIX):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # Removed by another process
+
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.__max_bytes:
+                break
+
+            try:
+                path.unlink()
+            except OSError:
+                continue
+
+            total_bytes -= size
+            logging.info("[cache] Evicted %s", path.name)
+
+    def run(self, detections, params):
+        """Run MHT on the detections, returning the cached solution if available."""
+        detections = list(detections)
+        key = cache_key(detections, params)
+        solution_coordinates = self.get(key)
+        if solution_coordinates is not None:
+            logging.info("[cache] Using cached result %s", key)
+            return solution_coordinates
+
+        solution_coordinates = MHT(detections, params).run()
+        self.put(key, solution_coordinates)
+        logging.info("[cache] Stored result %s", key)
+
+        return solution_coordinates
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+"""Checkpointing of the MHT tracker state for resuming long-running jobs."""
+
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+__author__ = "Jon Perdomo"
+__license__ = "GPL-3.0"
+
+
+def save_checkpoint(file_path, checkpoint):
+    """Write a checkpoint (see MHT.get_checkpoint) atomically as a compressed NumPy .npz file."""
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, 'wb') as checkpoint_file:
+        np.savez_compressed(checkpoint_file, **checkpoint)
+
+    os.replace(temp_path, file_path)
+
+
+def load_checkpoint(file_path):
+    """Read a checkpoint written by save_checkpoint."""
+    with np.load(file_path, allow_pickle=False) as checkpoint_file:
+        return {key: checkpoint_file[key] for key in checkpoint_file.files}
+
+
+class Checkpointer:
+    """
+    Save the tracker state every K frames and/or every T seconds.
+    The state is snapshotted in the tracking loop and written to disk in a
+    background thread, so the loop only waits if the previous write is still
+    in progress.
+    """
+    def __init__(self, file_path, every_frames=0, every_seconds=0.):
+        assert every_frames > 0 or every_seconds > 0, "A checkpoint frame or time interval is required."
+        self.__file_path = file_path
+        self.__every_frames = every_frames
+        self.__every_seconds = every_seconds
+        self.__frames = 0
+        self.__last_time = time.time()
+        self.__thread = None
+        self.__failure = None
+
+    def step(self, mht):
+        """Called by MHT after each frame. Saves a checkpoint when an interval has elapsed."""
+        self.__frames += 1
+        now = time.time()
+        if (self.__every_frames > 0 and self.__frames >= self.__every_frames) or \
+                (self.__every_seconds > 0 and now - self.__last_time >= self.__every_seconds):
+            self.__frames = 0
+            self.__last_time = now
+            self.save(mht)
+
+    def save(self, mht):
+        """Snapshot the tracker state and write it in the background."""
+        self.wait()
+        checkpoint = mht.get_checkpoint()
+        self.__thread = threading.Thread(target=self.__write, args=(checkpoint,), daemon=True)
+        self.__thread.start()
+
+    def __write(self, checkpoint):
+        try:
+            save_checkpoint(self.__file_path, checkpoint)
+            logging.info("[checkpoint] Saved frame %d to %s", checkpoint['frame_index'], self.__file_path)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.__failure = exc
+
+    def wait(self):
+        """Wait for the pending write, re-raising any exception raised while writing."""
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+        if self.__failure is not None:
+            failure, self.__failure = self.__failure, None
+            raise failure
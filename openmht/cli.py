@@ -1,4 +1,5 @@
 #!/usr/bin/env python
+import os
 import sys
 import argparse
 import time
@@ -8,7 +9,11 @@ import pkg_resources
 
 from pathlib import Path
 
+from .cache import CACHE_DIR_ENV, DEFAULT_MAX_BYTES, ResultCache, cache_key
+from .checkpoint import Checkpointer, load_checkpoint
 from .mht import MHT
+from .pipeline import BackgroundReader
+from .preprocess import iter_merged_detections
 
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s %(message)s',
@@ -17,52 +22,72 @@ logging.basicConfig(level=logging.INFO,
 __author__ = "Jon Perdomo"
 __license__ = "GPL-3.0"
 
+UV_CSV_HEADER = ['frame', 'track', 'u', 'v']
 
-def read_uv_csv(file_path, frame_max=100):
+
+def iter_uv_csv(file_path, frame_max=100):
     """
-    Read detections from a CSV.
+    Read detections from a CSV one frame at a time.
     Expected column headers are:
     Frame number, U, V
+    Yields the list of detections of each frame.
     """
     logging.info("Reading input CSV...")
-    detections = []
     with open(file_path, encoding='utf-8-sig') as csv_file:
         csv_reader = csv.reader(csv_file, delimiter=',')
         line_count = 0
         current_frame = None
-        detection_index = 0
+        frame_count = 0
+        frame_detections = None
         for row in csv_reader:
             if line_count == 0:
                 line_count += 1
             else:
                 frame_number, u, v = int(row[0]), float(row[1]), float(row[2])
                 if frame_number != current_frame:
-                    detection_index = len(detections)
-                    if detection_index == frame_max:
+                    if frame_detections is not None:
+                        yield frame_detections
+                        frame_detections = None
+
+                    if frame_count == frame_max:
                         break
 
-                    detections.append([])
+                    frame_detections = []
+                    frame_count += 1
                     current_frame = frame_number
 
-                detections[detection_index].append([u, v])
+                frame_detections.append([u, v])
                 line_count += 1
 
+        if frame_detections is not None:
+            yield frame_detections
+
         logging.info("Reading inputs complete. Processed %d lines.", line_count)
 
-    return detections
 
+def read_uv_csv(file_path, frame_max=100):
+    """
+    Read detections from a CSV.
+    Expected column headers are:
+    Frame number, U, V
+    """
+    return list(iter_uv_csv(file_path, frame_max=frame_max))
 
-def write_uv_csv(file_path, solution_coordinates):
+
+def iter_uv_rows(solution_coordinates):
     """
-    Write track trees to a CSV.
+    Yield the output CSV rows of each frame, ordered by track number.
     Column headers are:
     Frame number, track number, U, V
     """
-    logging.info("Writing output CSV...")
-    csv_rows = []
-    # Flatten the track trees into a list of coordinates
-    for track_index, track_coordinates in enumerate(solution_coordinates):
-        for frame_index, coordinate in enumerate(track_coordinates):
+    frame_count = max((len(track_coordinates) for track_coordinates in solution_coordinates), default=0)
+    for frame_index in range(frame_count):
+        csv_rows = []
+        for track_index, track_coordinates in enumerate(solution_coordinates):
+            if frame_index >= len(track_coordinates):
+                continue
+
+            coordinate = track_coordinates[frame_index]
             if coordinate is None:
                 u = v = 'None'
             else:
@@ -70,12 +95,21 @@ def write_uv_csv(file_path, solution_coordinates):
 
             csv_rows.append([frame_index, track_index, u, v])
 
-    # Sort the results by frame number
-    csv_rows.sort(key=lambda x: x[0])
+        yield csv_rows
+
+
+def write_uv_csv(file_path, solution_coordinates):
+    """
+    Write track trees to a CSV.
+    Column headers are:
+    Frame number, track number, U, V
+    """
+    logging.info("Writing output CSV...")
     with open(file_path, 'w', encoding='utf-8-sig') as csv_file:
         writer = csv.writer(csv_file, lineterminator='\n')
-        writer.writerow(['frame', 'track', 'u', 'v'])
-        writer.writerows(csv_rows)
+        writer.writerow(UV_CSV_HEADER)
+        for csv_rows in iter_uv_rows(solution_coordinates):
+            writer.writerows(csv_rows)
 
     logging.info("CSV saved to %s", file_path)
 
@@ -83,6 +117,7 @@ def write_uv_csv(file_path, solution_coordinates):
 def read_parameters(params_file_path):
     """Read in the current Kalman filter parameters."""
     param_keys = ["v", "dth", "k", "q", "r", "n", "bth", "nmiss", "pd"]
+    optional_params = {"nmerge": 0., "mtol": 0.}  # Branch merging is disabled by default
     params = {}
 
     # Open the parameter file and read in the parameters
@@ -91,13 +126,16 @@ def read_parameters(params_file_path):
             line_data = line.split("#")[0].split('=')
             if len(line_data) == 2:
                 key, val = [s.strip() for s in line_data]
-                if key in param_keys:
+                if key in param_keys or key in optional_params:
                     try:
                         val = float(val)
                     except ValueError as exc:
                         raise AssertionError(f"Incorrect value type in params.txt: {line}") from exc
 
-                    param_keys.remove(key)
+                    if key in param_keys:
+                        param_keys.remove(key)
+                    else:
+                        optional_params.pop(key)
                     params[key] = val
             else:
                 raise AssertionError(f"Error in params.txt formatting: {line}")
@@ -105,6 +143,8 @@ def read_parameters(params_file_path):
     if param_keys:
         raise AssertionError("Parameters not found in params.txt: " + ", ".join(param_keys))
 
+    params.update(optional_params)
+
     return params
 
 
@@ -130,6 +170,26 @@ def run(cli_args=None):
     # Track visualization parameters
     parser.add_argument('-p', '--plot', action='store_true', help="Plot the tracks")
 
+    # Detection preprocessing parameters
+    parser.add_argument('-m', '--merge-radius', type=float, default=0.,
+                        help="Merge detections within this radius in each frame into their centroid")
+
+    # Result cache parameters
+    parser.add_argument('--cache-dir', default=os.environ.get(CACHE_DIR_ENV),
+                        help=f"Cache results in this directory (Default: ${CACHE_DIR_ENV}, disabled if unset)")
+    parser.add_argument('--cache-size', type=float, default=DEFAULT_MAX_BYTES / 1e6,
+                        help="Maximum cache size in MB, least recently used results are evicted")
+    parser.add_argument('--no-cache', action='store_true', help="Bypass the result cache")
+
+    # Checkpoint parameters
+    parser.add_argument('-c', '--checkpoint', help="Checkpoint file path (NPZ) for saving the tracker state")
+    parser.add_argument('--checkpoint-frames', type=int, default=100,
+                        help="Save a checkpoint every K frames (Default: 100, 0 disables)")
+    parser.add_argument('--checkpoint-seconds', type=float, default=0.,
+                        help="Save a checkpoint every T seconds (Default: 0, disabled)")
+    parser.add_argument('-r', '--resume', action='store_true',
+                        help="Resume from the checkpoint file if it exists")
+
     # Parse arguments
     args = parser.parse_args(cli_args)
     input_file = args.ifile
@@ -143,6 +203,8 @@ def run(cli_args=None):
         assert Path(input_file).suffix == '.csv', f"Input file is not CSV: {input_file}"
         assert Path(output_file).suffix == '.csv', f"Output file is not CSV: {output_file}"
         assert Path(param_file).suffix == '.txt', f"Parameter file is not TXT: {param_file}"
+        assert not args.checkpoint or args.checkpoint_frames > 0 or args.checkpoint_seconds > 0, \
+            "A checkpoint frame or time interval is required (--checkpoint-frames or --checkpoint-seconds)."
 
     except AssertionError as param_error:
         print(param_error)
@@ -161,11 +223,59 @@ def run(cli_args=None):
         print(param_error)
         sys.exit(2)
 
-    # Run MHT on detections
-    detections = read_uv_csv(input_file)
+    # Run MHT on detections. Input frames are parsed ahead of the tracker in a
+    # background thread. Track numbers are positions in the final solution, so
+    # the output is written once the last frame is tracked.
     start = time.time()
-    mht = MHT(detections, params)
-    solution_coordinates = mht.run()
+    reader = BackgroundReader(iter_uv_csv(input_file))
+    try:
+        detections = reader
+        if args.merge_radius > 0:
+            detections = iter_merged_detections(detections, args.merge_radius)
+            logging.info("Merging detections within radius %s", args.merge_radius)
+
+        cache = key = solution_coordinates = None
+        if args.cache_dir and not args.no_cache:
+            cache = ResultCache(args.cache_dir, max_bytes=int(args.cache_size * 1e6))
+            detections = list(detections)
+            key = cache_key(detections, params)
+            solution_coordinates = cache.get(key)
+            if solution_coordinates is not None:
+                logging.info("[cache] Using cached result %s", key)
+
+        if solution_coordinates is None:
+            mht = MHT(detections, params)
+            checkpointer = None
+            if args.checkpoint:
+                if args.resume and Path(args.checkpoint).is_file():
+                    checkpoint = load_checkpoint(args.checkpoint)
+                    try:
+                        mht.set_checkpoint(checkpoint)
+                    except AssertionError as checkpoint_error:
+                        print(checkpoint_error)
+                        sys.exit(2)
+
+                    logging.info("Resuming from checkpoint %s at frame %d", args.checkpoint,
+                                 checkpoint['frame_index'])
+
+                checkpointer = Checkpointer(args.checkpoint, every_frames=args.checkpoint_frames,
+                                            every_seconds=args.checkpoint_seconds)
+
+            try:
+                solution_coordinates = mht.run(checkpointer)
+            except AssertionError as run_error:
+                print(run_error)
+                sys.exit(2)
+            finally:
+                if checkpointer is not None:
+                    checkpointer.wait()
+
+            if cache is not None:
+                cache.put(key, solution_coordinates)
+                logging.info("[cache] Stored result %s", key)
+    finally:
+        reader.close()
+
     write_uv_csv(output_file, solution_coordinates)
     end = time.time()
     elapsed_seconds = end - start
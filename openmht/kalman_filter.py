@@ -27,6 +27,21 @@ class KalmanFilter:
         """Return the track score."""
         return self.__track_score
 
+    def get_state(self):
+        """Return the a posteri state estimate and its covariance."""
+        return self.__xhat, self.__P
+
+    def get_checkpoint(self):
+        """Return the state needed to resume the filter: estimate, covariance, track score and missed detections."""
+        return self.__xhat, self.__P, self.__track_score, self.__nmiss
+
+    def set_checkpoint(self, xhat, P, track_score, nmiss):
+        """Restore the state returned by get_checkpoint."""
+        self.__xhat = np.array(xhat, dtype=float).reshape(self.__dims, 1)
+        self.__P = np.array(P, dtype=float).reshape(self.__dims, self.__dims)
+        self.__track_score = float(track_score)
+        self.__nmiss = int(nmiss)
+
     def update(self, z):
         """Update the Kalman filter with a new observation."""
         if z is None:
@@ -7,6 +7,11 @@ from .kalman_filter import KalmanFilter
 
 from copy import deepcopy
 
+import json
+import itertools
+
+import numpy as np
+
 import logging
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s %(message)s',
@@ -16,18 +21,54 @@ logging.basicConfig(level=logging.INFO,
 __author__ = "Jon Perdomo"
 __license__ = "GPL-3.0"
 
+MISSED_DETECTION = -1  # Detection ID of a missed detection in a track
+DETECTION_ID_DTYPE = np.int32  # Data type of detection and track IDs in the branch histories
+
+
+def _reserve(array, length):
+    """Return the array, or a copy with doubled capacity along the first axis if it is shorter than the length."""
+    capacity = len(array)
+    if length <= capacity:
+        return array
+
+    grown = np.zeros((max(length, 2 * capacity),) + array.shape[1:], dtype=array.dtype)
+    grown[:capacity] = array
+
+    return grown
+
 
 class MHT:
     """Main class for the MHT algorithm."""
     def __init__(self, detections, params):
-        self.__detections = list(detections)
+        self.__detections = detections  # Iterable of per-frame detections, consumed by run()
         self.__params = params
 
+        # Detection store: the coordinates of all detections in one contiguous array, with
+        # the detections of frame i at rows frame_offsets[i] to frame_offsets[i+1]. The row
+        # of a detection is its ID. Both arrays are over-allocated to grow in amortized O(1).
+        self.__coordinates = np.zeros((0, 0))
+        self.__frame_offsets = np.zeros(1, dtype=np.int64)
+        self.__detection_count = 0
+
+        # Tracker state
+        # Detection IDs for all frame tracks (one row per branch, one column per frame)
+        self.__track_detections = np.zeros((0, 0), dtype=DETECTION_ID_DTYPE)
+        self.__kalman_filters = []
+        # Track ID of each branch: the ID of the detection that started its track tree. Continued
+        # branches keep the ID of their parent, so a track keeps its ID from frame to frame.
+        self.__track_ids = np.zeros(0, dtype=DETECTION_ID_DTYPE)
+        self.__solution_detections = np.zeros((0, 0), dtype=DETECTION_ID_DTYPE)  # Detection IDs of the solution track trees
+        self.__solution_track_ids = np.zeros(0, dtype=DETECTION_ID_DTYPE)  # Track IDs of the solution track trees
+        self.__frame_index = 0
+
     def __global_hypothesis(self, track_trees, conflicting_tracks):
         """
         Generate a global hypothesis by finding the maximum weighted independent
         set of a graph with tracks as vertices, and edges between conflicting tracks.
         """
+        if not track_trees:
+            return []
+
         logging.info("Calculating MWIS...")
         gh_graph = WeightedGraph()
         for index, kalman_filter in enumerate(track_trees):
@@ -40,17 +81,32 @@ class MHT:
 
         return mwis_ids
 
-    def __generate_track_trees(self):
-        """ Run the MHT algorithm."""
-
-        logging.info("Generating track trees...")
-        track_detections = []  # Detections for all frame tracks
-        kalman_filters = []
-        coordinates = []  # Coordinates for all frame detections
-        frame_index = 0
+    def __add_frame(self, detections):
+        """Append the detections of the next frame to the detection store. Returns their coordinates."""
+        frame_coordinates = np.asarray(detections, dtype=float)
+        if self.__detection_count == 0 and len(frame_coordinates) > 0:
+            self.__coordinates = np.zeros((0, frame_coordinates.shape[1]))
+
+        frame_coordinates = frame_coordinates.reshape(len(frame_coordinates), self.__coordinates.shape[1])
+        first_id = self.__detection_count
+        self.__detection_count += len(frame_coordinates)
+        assert self.__detection_count <= np.iinfo(DETECTION_ID_DTYPE).max, "Too many detections for the detection IDs."
+        self.__coordinates = _reserve(self.__coordinates, self.__detection_count)
+        self.__coordinates[first_id:self.__detection_count] = frame_coordinates
+        self.__frame_offsets = _reserve(self.__frame_offsets, self.__frame_index + 2)
+        self.__frame_offsets[self.__frame_index + 1] = self.__detection_count
+
+        return self.__coordinates[first_id:self.__detection_count]
+
+    def update(self, detections):
+        """Extend the track trees with the detections of the next frame and prune them."""
+        kalman_filters = self.__kalman_filters
+        frame_index = self.__frame_index
         n_scan = int(self.__params.get('n'))  # Frame look-back for pruning
         b_th = self.__params.get('bth')  # Max. number of track tree branches
         nmiss = self.__params.get('nmiss')  # Max. number of false observations in tracks
+        n_merge = int(self.__params.get('nmerge', 0))  # Frame look-back for merging branches
+        m_tol = self.__params.get('mtol', 0)  # State tolerance for merging branches
 
         # Kalman filter parameters
         v = self.__params.get('v')
@@ -60,147 +116,313 @@ class MHT:
         r = self.__params.get('r')
         pd = self.__params.get('pd')
 
-        # b_th = int(self.__params.pop())  # Max. number of track tree branches
-        # nmiss = self.__params.nmiss  # Max. number of false observations in tracks
-        solution_coordinates = []  # Coordinates for the solution track trees
-
-        # Generate trees and compute the solution
-        while self.__detections:
-            coordinates.append({})
-            detections = self.__detections.pop(0)
-            logging.info("Frame {}: {} detections".format(frame_index, len(detections)))
-            track_count = len(kalman_filters)
-            for index, detection in enumerate(detections):
-                branches_added = 0  # Number of branches added to the track tree at this frame
-                detection_id = str(index)
-                coordinates[frame_index][detection_id] = detection
-
-                # Update existing branches
-                for i in range(track_count):
-                    # Copy and update the Kalman filter
-                    track_tree = kalman_filters[i]
-                    continued_branch = deepcopy(track_tree)
-                    continued_branch.update(detection)
-                    kalman_filters.append(continued_branch)
-                    track_detections.append(track_detections[i] + [detection_id])
-                    branches_added += 1
-
-                # Create a new branch with the current detection:
-
-                # Create a new Kalman filter
-                kalman_filters.append(KalmanFilter(detection, v=v, dth=dth, k=k, q=q, r=r, nmiss=nmiss, pd=pd))
-
-                # Create a new track detection list (list of detection IDs for each frame)
-                # Each track detection list is a branch of the track tree, and is used to
-                # quickly determine conflicting tracks and to query the Kalman filter list for
-                # the global hypothesis.
-                # First, create a list of empty strings for each frame prior to the current frame.
-                # Then, append the detection ID to the current frame.
-                track_detection_id = [''] * frame_index + [detection_id]
-                track_detections.append(track_detection_id)
+        first_id = self.__detection_count
+        detections = self.__add_frame(detections)
+        logging.info("Frame {}: {} detections".format(frame_index, len(detections)))
+        track_count = len(kalman_filters)
+
+        # Each row of the track detections is a branch of the track tree, and is used to
+        # quickly determine conflicting tracks and to query the Kalman filter list for
+        # the global hypothesis. The existing branches keep their rows (with a missed
+        # detection at the current frame), followed by the new branches of each detection.
+        previous_detections = self.__track_detections
+        track_detections = np.full((track_count + len(detections) * (track_count + 1), frame_index + 1),
+                                   MISSED_DETECTION, dtype=DETECTION_ID_DTYPE)
+        track_detections[:track_count, :frame_index] = previous_detections
+        track_ids = np.empty(len(track_detections), dtype=DETECTION_ID_DTYPE)
+        track_ids[:track_count] = self.__track_ids
+        branches_added = 0  # Number of branches added to the track tree at this frame (none for an empty frame)
+        for index, detection in enumerate(detections):
+            branches_added = 0
+            detection_id = first_id + index
+            first_branch = len(kalman_filters)
+
+            # Update existing branches
+            for i in range(track_count):
+                # Copy and update the Kalman filter
+                track_tree = kalman_filters[i]
+                continued_branch = deepcopy(track_tree)
+                continued_branch.update(detection)
+                kalman_filters.append(continued_branch)
                 branches_added += 1
 
-            # Update the previous filter with a dummy detection
-            prune_ids = set()
-            nmiss_prune_count = 0
-            for j in range(track_count):
-
-                # Update with dummy detection coordinates
-                update_success = kalman_filters[j].update(None)
-
-                # Append a dummy detection ID to the track detection list
-                track_detections[j].append('')
-
-                # If the track was pruned, add it to the prune list
-                if not update_success:
-                    prune_ids.add(j)
-                    nmiss_prune_count += 1
-            
-            # Log the N-miss pruning
-            if nmiss_prune_count > 0:
-                logging.info("[nmiss] Pruned %d branch(es) at frame %d", nmiss_prune_count, frame_index)
-
-            # Prune subtrees that diverge from the solution_trees at frame k-N
-            prune_index = max(0, frame_index-n_scan)
-            conflicting_tracks = self.__get_conflicting_tracks(track_detections)
-            solution_ids = self.__global_hypothesis(kalman_filters, conflicting_tracks)
-            non_solution_ids = list(set(range(len(kalman_filters))) - set(solution_ids))
-            del solution_coordinates[:]
-            n_scan_prune_count = 0
-            for solution_id in solution_ids:
-                detections = track_detections[solution_id]  # Detection IDs for the solution track tree
-                track_coordinates = []
-                for i, detection in enumerate(detections):
-                    if detection == '':
-                        track_coordinates.append(None)
-                    else:
-                        track_coordinates.append(coordinates[i][detection])
-                solution_coordinates.append(track_coordinates)
-
-                # Prune branches that diverge from the solution track tree at frame k-N
-                d_id = track_detections[solution_id][prune_index]
-                if d_id != '':
-                    for non_solution_id in non_solution_ids:
-                        if d_id == track_detections[non_solution_id][prune_index]:
-                            prune_ids.add(non_solution_id)
-                            n_scan_prune_count += 1
-
-            # Log the N-scan pruning
-            if n_scan_prune_count > 0:
-                logging.info("[nscan] Pruned %d branch(es) at frame N-%d", n_scan_prune_count, n_scan)
-
-            # Prune branches that exceed the maximum number of branches and keep only the top b_th branches
-            branch_count = branches_added - len(prune_ids)
-            if branch_count > b_th:
-                
-                # Get the top b_th branches by score
-                branch_scores = []
-                for i, track_tree in enumerate(kalman_filters):
-                    if i not in prune_ids:
-                        branch_scores.append((i, track_tree.get_track_score()))
-
-                # Sort by score and keep the top b_th branches
-                branch_scores.sort(key=lambda x: x[1], reverse=True)
-                prune_ids.update([x[0] for x in branch_scores[b_th:]])
-
-                # Log the B-threshold pruning
-                b_th_prune_count = branches_added - len(prune_ids)
-                if b_th_prune_count > 0:
-                    logging.info("[bth] Pruned %d branch(es) using B-threshold.", b_th_prune_count)
-
-            # Prune tracks identified by n-scan, n-miss, and b-threshold
-            for k in sorted(prune_ids, reverse=True):
-                del track_detections[k]
-                del kalman_filters[k]
-            
-            frame_index += 1
-
-        logging.info("Generated %d track trees", len(solution_coordinates))
+            track_detections[first_branch:first_branch + track_count, :frame_index] = previous_detections
+            track_ids[first_branch:first_branch + track_count] = self.__track_ids
+
+            # Create a new branch with the current detection:
+
+            # Create a new Kalman filter
+            kalman_filters.append(KalmanFilter(detection, v=v, dth=dth, k=k, q=q, r=r, nmiss=nmiss, pd=pd))
+            track_ids[first_branch + track_count] = detection_id
+            branches_added += 1
+
+            # Assign the detection ID to the current frame of the continued and new branches
+            track_detections[first_branch:len(kalman_filters), frame_index] = detection_id
+
+        # Update the previous filter with a dummy detection
+        prune_ids = set()
+        nmiss_prune_count = 0
+        for j in range(track_count):
+
+            # Update with dummy detection coordinates
+            update_success = kalman_filters[j].update(None)
+
+            # If the track was pruned, add it to the prune list
+            if not update_success:
+                prune_ids.add(j)
+                nmiss_prune_count += 1
+
+        # Log the N-miss pruning
+        if nmiss_prune_count > 0:
+            logging.info("[nmiss] Pruned %d branch(es) at frame %d", nmiss_prune_count, frame_index)
+
+        # Merge branches that are identical going forward before they enter the global hypothesis
+        if n_merge > 0 or m_tol > 0:
+            merge_ids = self.__get_merged_branches(kalman_filters, track_detections, prune_ids, n_merge, m_tol)
+            if merge_ids:
+                keep = np.ones(len(kalman_filters), dtype=bool)
+                keep[list(merge_ids)] = False
+                track_detections = track_detections[keep]
+                track_ids = track_ids[keep]
+                kalman_filters[:] = [kalman_filter for kalman_filter, kept in zip(kalman_filters, keep) if kept]
+
+                # Shift the remaining prune IDs to account for the removed branches
+                new_ids = np.cumsum(keep) - 1
+                prune_ids = {int(new_ids[i]) for i in prune_ids}
+                logging.info("[merge] Merged %d branch(es) at frame %d", len(merge_ids), frame_index)
+
+        # Prune subtrees that diverge from the solution_trees at frame k-N
+        prune_index = max(0, frame_index-n_scan)
+        conflicting_tracks = self.__get_conflicting_tracks(track_detections)
+        solution_ids = list(self.__global_hypothesis(kalman_filters, conflicting_tracks))
+        non_solution_ids = np.array(sorted(set(range(len(kalman_filters))) - set(solution_ids)), dtype=np.int64)
+        self.__solution_detections = track_detections[solution_ids]
+        self.__solution_track_ids = track_ids[solution_ids]
+
+        # Prune branches that diverge from the solution track trees at frame k-N
+        solution_d_ids = self.__solution_detections[:, prune_index]
+        solution_d_ids = solution_d_ids[solution_d_ids != MISSED_DETECTION]
+        diverging_ids = non_solution_ids[np.isin(track_detections[non_solution_ids, prune_index], solution_d_ids)]
+        prune_ids.update(diverging_ids.tolist())
+        n_scan_prune_count = len(diverging_ids)
+
+        # Log the N-scan pruning
+        if n_scan_prune_count > 0:
+            logging.info("[nscan] Pruned %d branch(es) at frame N-%d", n_scan_prune_count, n_scan)
+
+        # Prune branches that exceed the maximum number of branches and keep only the top b_th branches
+        branch_count = branches_added - len(prune_ids)
+        if branch_count > b_th:
+
+            # Get the top b_th branches by score
+            branch_scores = []
+            for i, track_tree in enumerate(kalman_filters):
+                if i not in prune_ids:
+                    branch_scores.append((i, track_tree.get_track_score()))
+
+            # Sort by score and keep the top b_th branches
+            branch_scores.sort(key=lambda x: x[1], reverse=True)
+            prune_ids.update([x[0] for x in branch_scores[int(b_th):]])
+
+            # Log the B-threshold pruning
+            b_th_prune_count = branches_added - len(prune_ids)
+            if b_th_prune_count > 0:
+                logging.info("[bth] Pruned %d branch(es) using B-threshold.", b_th_prune_count)
+
+        # Prune tracks identified by n-scan, n-miss, and b-threshold
+        if prune_ids:
+            keep = np.ones(len(kalman_filters), dtype=bool)
+            keep[list(prune_ids)] = False
+            track_detections = track_detections[keep]
+            track_ids = track_ids[keep]
+            kalman_filters[:] = [kalman_filter for kalman_filter, kept in zip(kalman_filters, keep) if kept]
+
+        self.__track_detections = track_detections
+        self.__track_ids = track_ids
+        self.__frame_index += 1
+
+    def get_solution(self):
+        """
+        Return the coordinates of the current solution track trees: a list of tracks,
+        each a list of the detection coordinates at each frame (None for missed detections).
+        """
+        solution_coordinates = self.__coordinates[np.maximum(self.__solution_detections, 0)].tolist()
+        for track_coordinates, detections in zip(solution_coordinates, self.__solution_detections.tolist()):
+            for i, detection in enumerate(detections):
+                if detection == MISSED_DETECTION:
+                    track_coordinates[i] = None
 
         return solution_coordinates
 
+    def get_solution_detections(self):
+        """Return the detection IDs of the solution track trees (tracks x frames, -1 for missed detections)."""
+        return self.__solution_detections
+
+    def get_solution_track_ids(self):
+        """
+        Return the track IDs of the solution track trees. The ID of a track is the ID of its
+        first detection, so unlike the position of a track in the solution it is stable across frames.
+        """
+        return self.__solution_track_ids
+
+    def get_detection_coordinates(self):
+        """Return the coordinates of all detections, indexed by detection ID."""
+        return self.__coordinates[:self.__detection_count]
+
+    def get_branch_count(self):
+        """Return the number of branches in the track trees."""
+        return len(self.__kalman_filters)
+
+    def get_frame_count(self):
+        """Return the number of frames processed."""
+        return self.__frame_index
+
+    def get_checkpoint(self):
+        """
+        Return a snapshot of the tracker state as a dictionary of arrays: the detection
+        coordinates with per-frame offsets, the detection IDs and track IDs of each branch
+        and of each solution track (-1 for missed detections), the Kalman filter states
+        and the frame index.
+        """
+        frame_count = self.__frame_index
+        dims = self.__coordinates.shape[1]
+        filter_states = [kalman_filter.get_checkpoint() for kalman_filter in self.__kalman_filters]
+        return {
+            'params': np.array(json.dumps(self.__params, sort_keys=True)),
+            'frame_index': np.array(frame_count),
+            'offsets': self.__frame_offsets[:frame_count + 1].copy(),
+            'coordinates': self.get_detection_coordinates().copy(),
+            'track_detections': self.__track_detections.copy(),
+            'track_ids': self.__track_ids.copy(),
+            'solution_detections': self.__solution_detections.copy(),
+            'solution_track_ids': self.__solution_track_ids.copy(),
+            'xhat': np.array([state[0] for state in filter_states], dtype=float).reshape(len(filter_states), dims),
+            'covariance': np.array([state[1] for state in filter_states], dtype=float).reshape(
+                len(filter_states), dims, dims),
+            'scores': np.array([state[2] for state in filter_states], dtype=float),
+            'nmiss': np.array([state[3] for state in filter_states], dtype=np.int64),
+        }
+
+    def set_checkpoint(self, checkpoint):
+        """Restore the tracker state from a snapshot returned by get_checkpoint."""
+        assert json.loads(str(checkpoint['params'])) == json.loads(json.dumps(self.__params, sort_keys=True)), \
+            "Checkpoint parameters do not match the current parameters."
+
+        self.__coordinates = np.array(checkpoint['coordinates'], dtype=float)
+        self.__detection_count = len(self.__coordinates)
+        self.__frame_offsets = np.array(checkpoint['offsets'], dtype=np.int64)
+        self.__track_detections = np.array(checkpoint['track_detections'], dtype=DETECTION_ID_DTYPE)
+        self.__track_ids = np.array(checkpoint['track_ids'], dtype=DETECTION_ID_DTYPE)
+        self.__solution_detections = np.array(checkpoint['solution_detections'], dtype=DETECTION_ID_DTYPE)
+        self.__solution_track_ids = np.array(checkpoint['solution_track_ids'], dtype=DETECTION_ID_DTYPE)
+
+        # Rebuild the Kalman filters
+        self.__kalman_filters[:] = []
+        for xhat, covariance, score, nmiss in zip(checkpoint['xhat'], checkpoint['covariance'],
+                                                  checkpoint['scores'], checkpoint['nmiss']):
+            kalman_filter = KalmanFilter(xhat.tolist(), v=self.__params.get('v'), dth=self.__params.get('dth'),
+                                         k=self.__params.get('k'), q=self.__params.get('q'),
+                                         r=self.__params.get('r'), nmiss=self.__params.get('nmiss'),
+                                         pd=self.__params.get('pd'))
+            kalman_filter.set_checkpoint(xhat, covariance, score, nmiss)
+            self.__kalman_filters.append(kalman_filter)
+
+        self.__frame_index = int(checkpoint['frame_index'])
+
+    def __generate_track_trees(self, checkpointer=None):
+        """ Run the MHT algorithm."""
+
+        logging.info("Generating track trees...")
+
+        # Generate trees and compute the solution, skipping frames restored from a checkpoint
+        frames = iter(self.__detections)
+        self.__check_restored_frames(itertools.islice(frames, self.__frame_index))
+        for detections in frames:
+            self.update(detections)
+            if checkpointer is not None:
+                checkpointer.step(self)
+
+        logging.info("Generated %d track trees", len(self.__solution_detections))
+
+        return self.get_solution()
+
+    def __check_restored_frames(self, frames):
+        """Verify that the frames skipped on resuming from a checkpoint match the stored detections."""
+        frame_count = 0
+        for frame_index, detections in enumerate(frames):
+            stored = self.__coordinates[self.__frame_offsets[frame_index]:self.__frame_offsets[frame_index + 1]]
+            detections = np.asarray(detections, dtype=float)
+            assert detections.size == stored.size and np.array_equal(detections.reshape(stored.shape), stored), \
+                f"Checkpoint detections do not match frame {frame_index} of the input."
+            frame_count += 1
+
+        assert frame_count == self.__frame_index, \
+            f"Input has {frame_count} frames, fewer than the {self.__frame_index} frames of the checkpoint."
+
+    def __get_merged_branches(self, kalman_filters, track_detections, excluded_ids, n_merge, m_tol):
+        """
+        Find branches that are effectively the same hypothesis going forward: branches
+        whose last N_merge detection IDs match, or branches assigned the same detection in
+        the current frame whose Kalman state and covariance are within M_tol.
+        Only the highest scoring branch of each group survives.
+        Returns the IDs of the branches to remove.
+        """
+        # Visit the branches by descending score so the first branch of each group survives
+        branch_ids = [i for i in range(len(kalman_filters)) if i not in excluded_ids]
+        branch_ids.sort(key=lambda i: kalman_filters[i].get_track_score(), reverse=True)
+
+        merge_ids = set()
+        recent_histories = set()
+        survivor_states = {}
+        for i in branch_ids:
+            detections = track_detections[i]
+
+            # Merge by the last N_merge assignments (ignore histories of missed detections only)
+            if n_merge > 0:
+                recent_history = detections[-n_merge:]
+                if (recent_history != MISSED_DETECTION).any():
+                    recent_history = recent_history.tobytes()
+                    if recent_history in recent_histories:
+                        merge_ids.add(i)
+                        continue
+
+                    recent_histories.add(recent_history)
+
+            # Merge by the Kalman state and covariance
+            if m_tol > 0 and detections[-1] != MISSED_DETECTION:
+                xhat, covariance = kalman_filters[i].get_state()
+                states = survivor_states.setdefault(int(detections[-1]), [])
+                if any(np.allclose(xhat, s_xhat, rtol=0, atol=m_tol)
+                       and np.allclose(covariance, s_covariance, rtol=0, atol=m_tol)
+                       for s_xhat, s_covariance in states):
+                    merge_ids.add(i)
+                    continue
+
+                states.append((xhat, covariance))
+
+        return merge_ids
+
     def __get_conflicting_tracks(self, track_detections):
-        # Create a conflict matrix for each frame. Each row is a pair of conflicting tracks by index.
+        # Create a list of conflicting track pairs by index. Tracks conflict if they share a
+        # detection, and detection IDs are unique across frames.
         conflicting_tracks = []
-        for detections_a in track_detections:
-            for detections_b in track_detections:
-                if detections_a != detections_b:
-                    conflicting = False
-                    for frame_index, detection in enumerate(detections_a):
-                        if detection != '' and detection == detections_b[frame_index]:
-                            conflicting = True
-                            break
-
-                    if conflicting:
-                        conflicting_tracks.append((track_detections.index(detections_a), track_detections.index(detections_b)))
+        detected = track_detections != MISSED_DETECTION
+        for index, detections in enumerate(track_detections[:-1]):
+            shared = ((track_detections[index + 1:] == detections) & detected[index + 1:]).any(axis=1)
+            for other_index in np.flatnonzero(shared) + index + 1:
+                conflicting_tracks.append((index, int(other_index)))
+                conflicting_tracks.append((int(other_index), index))
 
         return conflicting_tracks
 
-    def run(self):
-        """Run the MHT algorithm."""
-        assert len(self.__detections) > 0, "No detections provided."
-        solution_coordinates = self.__generate_track_trees()
+    def run(self, checkpointer=None):
+        """
+        Run the MHT algorithm. If the tracker state was restored from a checkpoint,
+        the frames processed before the checkpoint are skipped. The checkpointer, if
+        provided, is notified after each frame (see checkpoint.Checkpointer).
+        """
+        solution_coordinates = self.__generate_track_trees(checkpointer)
+        assert self.__frame_index > 0, "No detections provided."
         logging.info("MHT complete.")
 
         return solution_coordinates
-    
\ No newline at end of file
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+"""Background thread for parsing input frames ahead of the tracker."""
+
+import queue
+import threading
+
+__author__ = "Jon Perdomo"
+__license__ = "GPL-3.0"
+
+_END = object()  # Sentinel marking the end of a queue
+
+
+class _Failure:
+    """Wraps an exception raised in a background thread."""
+    def __init__(self, exc):
+        self.exc = exc
+
+
+class _StageThread(threading.Thread):
+    """Base class for a pipeline stage communicating through a bounded queue."""
+    def __init__(self, queue_size):
+        super().__init__(daemon=True)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopped = threading.Event()
+
+    def _put(self, item):
+        """Put an item on the queue, blocking while it is full. Returns False if the stage was stopped."""
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+
+class BackgroundReader(_StageThread):
+    """
+    Consume an iterable (e.g. a CSV frame parser) in a background thread, reading
+    up to queue_size items ahead of the consumer. Iterating the reader yields the
+    items, and re-raises any exception raised while reading.
+    """
+    def __init__(self, iterable, queue_size=64):
+        super().__init__(queue_size)
+        self.__iterable = iterable
+        self.start()
+
+    def run(self):
+        try:
+            for item in self.__iterable:
+                if not self._put(item):
+                    return
+
+            self._put(_END)
+        except Exception as exc:  # pylint: disable=broad-except
+            self._put(_Failure(exc))
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                return
+
+            if isinstance(item, _Failure):
+                raise item.exc
+
+            yield item
+
+    def close(self):
+        """Stop reading ahead, e.g. when the consumer fails."""
+        self._stopped.set()
+        self.join()
+
@@ -1,114 +1,249 @@
 """Plot tracks from a file."""
 
+import argparse
+import io
+import itertools
 import os
+
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib.pyplot as plt
 import numpy as np
 
-def plot_2d_tracks(input_csv, Flag_Save=False, Frames=None):
-    """Plot tracks from a file in CSV format."""
-    # Get the filename for the plot title
-    filename = os.path.basename(input_csv)
-    plot_title = f"Tracks from {filename}"
-
-    # Read the CSV file
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+MAX_POINTS = 1000  # Maximum number of points plotted per track
+MAX_LEGEND_TRACKS = 20  # Tracks beyond this number are not listed in the legend
+LOAD_CHUNK_SIZE = 100000  # Number of CSV rows parsed at a time
+
+# Worker process state, set by _init_worker
+_tracks = None
+
+
+class Tracks:
+    """Track coordinates loaded from an output CSV, grouped by track and sorted by frame."""
+    def __init__(self, track_ids, frames, coordinates):
+        order = np.lexsort((frames, track_ids))
+        self.track_ids = track_ids[order]
+        self.frames = frames[order]
+        self.coordinates = coordinates[order]
+
+        # Start of each track in the sorted rows
+        self.ids, self.starts, self.lengths = np.unique(self.track_ids, return_index=True, return_counts=True)
+
+    def select(self, frames=None, track_ids=None):
+        """Return the tracks restricted to an inclusive frame range and/or a set of track IDs."""
+        rows = np.arange(len(self.frames))
+        if track_ids is not None:
+            # Take the contiguous rows of each selected track present in the tracks
+            track_ids = np.asarray(track_ids, dtype=np.int64).ravel()
+            track_index = np.searchsorted(self.ids, track_ids)
+            present = track_index < len(self.ids)
+            present[present] = self.ids[track_index[present]] == track_ids[present]
+            track_index = np.unique(track_index[present])
+            lengths = self.lengths[track_index]
+            rows = np.repeat(self.starts[track_index] - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+        if frames is not None:
+            rows = rows[(self.frames[rows] >= frames[0]) & (self.frames[rows] <= frames[1])]
+
+        return Tracks(self.track_ids[rows], self.frames[rows], self.coordinates[rows])
+
+    def decimate(self, max_points=MAX_POINTS):
+        """Return the tracks with at most about max_points evenly spaced points per track."""
+        steps = np.maximum(1, np.ceil(self.lengths / max_points)).astype(np.int64)
+        track_index = np.repeat(np.arange(len(self.ids)), self.lengths)
+        rank = np.arange(len(self.frames)) - self.starts[track_index]
+        keep = (rank % steps[track_index] == 0) | (rank == self.lengths[track_index] - 1)
+
+        return Tracks(self.track_ids[keep], self.frames[keep], self.coordinates[keep])
+
+
+def load_tracks(input_csv, chunk_size=LOAD_CHUNK_SIZE):
+    """
+    Read the frame, track and coordinate columns of an output CSV into arrays.
+    The file is parsed in chunks of rows, with None (a missed detection) read as NaN.
+    """
+    chunks = []
     with open(input_csv, 'r', encoding='utf-8-sig') as f:
-        lines = f.readlines()
-
-    # Remove the header
-    lines = lines[1:]
-
-    # Sort the lines by track ID (column 2)
-    lines.sort(key=lambda x: int(x.split(',')[1]))
-
-    # Loop through the lines and parse the coordinates (columns 3 and 4) into a list of tracks
-    tracks = []
-    track_ids = []
-    previous_track_id = None
-    for line in lines:
-        current_track_id = int(line.split(',')[1])
-        x, y = line.split(',')[2:]
-        if current_track_id != previous_track_id:
-            # Store the previous track
-            if previous_track_id is not None:
-                tracks.append(track)
-
-            # Create a new track
-            track = []
-
-            # Update the track ID
-            previous_track_id = current_track_id
-            track_ids.append(previous_track_id)
-            
-        
-        # Add the coordinates to the track
-        x, y = line.split(',')[2:]
-        frame = line.split(',')[0]
-
-        # Convert 'None' values to NaN
-        if 'None' in x:
-            x = 'nan'
-        if 'None' in y:
-            y = 'nan'
-
-        track.append((int(frame.strip()), float(x.strip()), float(y.strip())))
-    tracks.append(track)
-    # Plot the tracks
-    # fig = plt.figure(figsize=(10,10))
-    # plot_axis = fig.add_subplot(111)
-    fig, axes = plt.subplots(nrows=1, ncols=2, figsize=(18,9))
-    for i, track in enumerate(tracks):
-        # Set a unique color for each track
-        color = next(axes[0]._get_lines.prop_cycler)['color']
-
-        # Convert the track to a list of X and Y coordinates
-        frame, x, y = zip(*track)
-        
-        if Frames is not None:
-            j = np.where(np.all([np.array(frame) >= Frames[0], 
-                                 np.array(frame) <= Frames[1]], axis=0))[0]
-            if np.size(j) >= 1:
-                frame = np.array(frame)[j]
-                x = np.array(x)[j]
-                y = np.array(y)[j]
-
-                # Plot the track as a line
-                axes[0].plot(x, y, color=color, label="Track %d"%track_ids[i])
-        
-                # Plot each point in the track as a black dot
-                axes[0].scatter(x, y, color=color)
-                axes[1].plot(frame, x, '-o', color=color, label="x, Track %d"%track_ids[i])
-                axes[1].plot(frame, y, '--s', color=color, label="y, Track %d"%track_ids[i])
-        else:
+        next(f, None)  # Skip the header
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                break
+
+            chunks.append(np.loadtxt(io.StringIO(''.join(lines).replace('None', 'nan')), delimiter=',', ndmin=2))
+
+    data = np.concatenate(chunks) if chunks else np.zeros((0, 4))
+
+    return Tracks(data[:, 1].astype(np.int64), data[:, 0].astype(np.int64), data[:, 2:])
+
+
+def _segments(tracks, x, y):
+    """
+    Return the line segments between consecutive detected points of each track,
+    and the track index of each segment.
+    """
+    points = np.column_stack((x, y))
+    valid = ~np.isnan(points).any(axis=1)
+    connected = valid[:-1] & valid[1:] & (tracks.track_ids[:-1] == tracks.track_ids[1:])
+    starts = np.flatnonzero(connected)
+    segments = np.stack((points[starts], points[starts + 1]), axis=1)
 
-            # Plot the track as a line
-            axes[0].plot(x, y, color=color, label="Track %d"%track_ids[i])
-    
-            # Plot each point in the track as a black dot
-            axes[0].scatter(x, y, color=color)
-            axes[1].plot(frame, x, '-o', color=color, label="x, Track %d"%track_ids[i])
-            axes[1].plot(frame, y, '--s', color=color, label="y, Track %d"%track_ids[i])
+    return segments, np.searchsorted(tracks.ids, tracks.track_ids[starts])
+
+
+def _draw(axes, tracks, plot_title, max_points=MAX_POINTS, max_legend_tracks=MAX_LEGEND_TRACKS):
+    """Draw the tracks on the U-V axes and the frame axes."""
+    tracks = tracks.decimate(max_points)
+
+    # Set a unique color for each track from the color cycle
+    color_cycle = np.array(plt.rcParams['axes.prop_cycle'].by_key()['color'])
+    track_colors = color_cycle[np.arange(len(tracks.ids)) % len(color_cycle)]
+    point_colors = track_colors[np.searchsorted(tracks.ids, tracks.track_ids)]
+    u, v = tracks.coordinates[:, 0], tracks.coordinates[:, 1]
+
+    # Plot the tracks as lines and each point in the tracks as a dot
+    segments, segment_tracks = _segments(tracks, u, v)
+    axes[0].add_collection(LineCollection(segments, colors=track_colors[segment_tracks]))
+    axes[0].scatter(u, v, c=point_colors, s=12)
+
+    for coordinate, linestyle, marker in ((u, '-', 'o'), (v, '--', 's')):
+        segments, segment_tracks = _segments(tracks, tracks.frames, coordinate)
+        axes[1].add_collection(LineCollection(segments, colors=track_colors[segment_tracks], linestyles=linestyle))
+        axes[1].scatter(tracks.frames, coordinate, c=point_colors, marker=marker, s=12)
+
+    for axis in axes:
+        axis.autoscale_view()
 
     # Set the axis labels and title
     axes[0].set_xlabel('X')
     axes[0].set_ylabel('Y')
     axes[0].set_title(plot_title)
-    axes[0].legend()
-
     axes[1].set_xlabel('Frame')
     axes[1].set_ylabel('X or Y')
-    axes[1].legend()
-    
+
+    # List the tracks in the legend only if there are few of them
+    if 0 < len(tracks.ids) <= max_legend_tracks:
+        handles = [Line2D([], [], color=color, marker='o') for color in track_colors]
+        axes[0].legend(handles, ["Track %d" % track_id for track_id in tracks.ids])
+        axes[1].legend([Line2D([], [], color='k', marker='o'), Line2D([], [], color='k', linestyle='--', marker='s')],
+                       ['x', 'y'])
+
+
+def plot_2d_tracks(input_csv, Flag_Save=False, Frames=None, max_points=MAX_POINTS):
+    """Plot tracks from a file in CSV format."""
+    # Get the filename for the plot title
+    filename = os.path.basename(input_csv)
+    plot_title = f"Tracks from {filename}"
+
+    tracks = load_tracks(input_csv)
+    if Frames is not None:
+        tracks = tracks.select(frames=Frames)
+
+    fig, axes = plt.subplots(nrows=1, ncols=2, figsize=(18, 9))
+    _draw(axes, tracks, plot_title, max_points=max_points)
     plt.tight_layout()
-    
+
     if Flag_Save:
         if Frames is not None:
-            fname_out = os.path.join(os.path.dirname(input_csv), 
-                                     "%s_Frames_%d_%d"%(os.path.basename(input_csv).split('.')[0], Frames[0], Frames[1]))
+            fname_out = os.path.join(os.path.dirname(input_csv),
+                                     "%s_Frames_%d_%d" % (os.path.basename(input_csv).split('.')[0], Frames[0], Frames[1]))
         else:
             fname_out = os.path.join(os.path.dirname(input_csv), os.path.basename(input_csv).split('.')[0])
-        plt.savefig("%s.png"%fname_out)
+        plt.savefig("%s.png" % fname_out)
     else:
         plt.show()
 
-    plt.close()  # Close the figure so it doesn't consume memory
-    
\ No newline at end of file
+    plt.close(fig)  # Close the figure so it doesn't consume memory
+
+
+def _init_worker(input_csv):
+    """Load the tracks once per worker process."""
+    global _tracks  # pylint: disable=global-statement
+    _tracks = load_tracks(input_csv)
+
+
+def _render(output_path, plot_title, frames=None, track_ids=None, figsize=(18, 9), max_points=MAX_POINTS):
+    """Render the selected tracks to an image file without a display."""
+    fig = Figure(figsize=figsize)
+    axes = fig.subplots(nrows=1, ncols=2)
+    _draw(axes, _tracks.select(frames=frames, track_ids=track_ids), plot_title, max_points=max_points)
+    fig.tight_layout()
+    fig.savefig(output_path)
+
+    return output_path
+
+
+def export_frame_ranges(input_csv, frame_ranges, output_dir, workers=None, max_points=MAX_POINTS):
+    """
+    Render each inclusive (first, last) frame range to a PNG file in parallel.
+    Returns the list of file paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    basename = os.path.basename(input_csv).split('.')[0]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(input_csv,)) as executor:
+        futures = [executor.submit(_render, os.path.join(output_dir, "%s_Frames_%d_%d.png" % (basename, first, last)),
+                                   "Tracks from %s, frames %d-%d" % (basename, first, last), frames=(first, last),
+                                   max_points=max_points)
+                   for first, last in frame_ranges]
+
+        return [future.result() for future in futures]
+
+
+def export_track_thumbnails(input_csv, output_dir, track_ids=None, workers=None, figsize=(6, 3),
+                            max_points=MAX_POINTS):
+    """
+    Render each track (Default: all tracks) to its own PNG thumbnail in parallel.
+    Returns the list of file paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if track_ids is None:
+        track_ids = load_tracks(input_csv).ids.tolist()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(input_csv,)) as executor:
+        futures = [executor.submit(_render, os.path.join(output_dir, "Track_%d.png" % track_id),
+                                   "Track %d" % track_id, track_ids=[track_id], figsize=figsize,
+                                   max_points=max_points)
+                   for track_id in track_ids]
+
+        return [future.result() for future in futures]
+
+
+def _frame_range(text):
+    first, last = [int(x) for x in text.split(':')]
+    return first, last
+
+
+def run(cli_args=None):
+    """Read in the command line parameters and export track plots."""
+    parser = argparse.ArgumentParser(description="Export OpenMHT track plots to PNG files.")
+    parser.add_argument('ifile', help="Output CSV file path of OpenMHT")
+    parser.add_argument('odir', help="Directory for the PNG files")
+    parser.add_argument('-f', '--frames', type=_frame_range, action='append', metavar='FIRST:LAST',
+                        help="Render an inclusive frame range (repeatable)")
+    parser.add_argument('-t', '--thumbnails', action='store_true', help="Render a thumbnail for each track")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Number of worker processes")
+    parser.add_argument('--max-points', type=int, default=MAX_POINTS, help="Maximum points plotted per track")
+    args = parser.parse_args(cli_args)
+
+    paths = []
+    if args.frames or not args.thumbnails:
+        tracks = load_tracks(args.ifile)
+        frame_ranges = args.frames or [(int(tracks.frames.min(initial=0)), int(tracks.frames.max(initial=0)))]
+        paths += export_frame_ranges(args.ifile, frame_ranges, args.odir, workers=args.workers,
+                                     max_points=args.max_points)
+
+    if args.thumbnails:
+        paths += export_track_thumbnails(args.ifile, args.odir, workers=args.workers, max_points=args.max_points)
+
+    for path in paths:
+        print(path)
+
+    return paths
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+
+"""Detection preprocessing: near-duplicate merging and per-frame spatial indexing."""
+
+from itertools import product
+
+import numpy as np
+
+__author__ = "Jon Perdomo"
+__license__ = "GPL-3.0"
+
+
+# Multipliers hashing integer grid cells to int64 keys (overflow wraps, and collisions only add candidates)
+_CELL_HASH = np.array([73856093, 19349663, 83492791, 49979687, 67867967], dtype=np.int64)
+
+
+def _neighbor_pairs(coordinates, radius):
+    """
+    Find the pairs (i, j), i < j, of detections within the radius of each other.
+    Detections are hashed to a grid of radius-sized cells and sorted by cell, so
+    each detection is only compared with the detections of its neighboring cells.
+    """
+    detection_count, dims = coordinates.shape
+    cells = np.floor(coordinates / radius).astype(np.int64)
+    cell_hash = np.resize(_CELL_HASH, dims)
+    keys = cells @ cell_hash
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    pairs_i, pairs_j = [], []
+    for offset in product((-1, 0, 1), repeat=dims):
+        # Range of the sorted detections in the neighboring cell of each detection
+        neighbor_keys = keys + np.dot(offset, cell_hash)
+        low = np.searchsorted(sorted_keys, neighbor_keys, side='left')
+        counts = np.searchsorted(sorted_keys, neighbor_keys, side='right') - low
+        if not counts.any():
+            continue
+
+        i = np.repeat(np.arange(detection_count), counts)
+        j = order[np.repeat(low - np.cumsum(counts) + counts, counts) + np.arange(len(i))]
+        offsets = coordinates[i] - coordinates[j]
+        within = (i < j) & (np.einsum('ij,ij->i', offsets, offsets) <= radius ** 2)
+        pairs_i.append(i[within])
+        pairs_j.append(j[within])
+
+    return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+
+def cluster_frame(coordinates, radius):
+    """
+    Cluster the detections of a single frame.
+    Detections within the radius of each other are connected, and each connected
+    component is labeled with the index of its first detection.
+    Returns an array of cluster labels.
+    """
+    assert radius > 0, "Radius must be positive."
+    coordinates = np.asarray(coordinates, dtype=float)
+    detection_count = len(coordinates)
+    if detection_count == 0:
+        return np.zeros(0, dtype=np.intp)
+
+    coordinates = coordinates.reshape(detection_count, -1)
+    pairs_i, pairs_j = _neighbor_pairs(coordinates, radius)
+
+    # Union-find over the pairs: hook the root of each pair to the smaller root, then
+    # compress the paths by pointer jumping, until the pairs of each component agree
+    labels = np.arange(detection_count)
+    while True:
+        roots_i, roots_j = labels[pairs_i], labels[pairs_j]
+        unmerged = roots_i != roots_j
+        if not unmerged.any():
+            break
+
+        roots_i, roots_j = roots_i[unmerged], roots_j[unmerged]
+        pairs_i, pairs_j = pairs_i[unmerged], pairs_j[unmerged]
+        np.minimum.at(labels, np.maximum(roots_i, roots_j), np.minimum(roots_i, roots_j))
+        while True:
+            parents = labels[labels]
+            if np.array_equal(parents, labels):
+                break
+
+            labels = parents
+
+    return labels
+
+
+def merge_frame(coordinates, radius, method='centroid', confidences=None):
+    """
+    Replace each cluster of detections in a frame with a single detection.
+    The method is either 'centroid' (mean position of the cluster) or 'max'
+    (the detection with the highest confidence).
+    Returns an array of the merged detections, ordered by their first detection.
+    """
+    coordinates = np.asarray(coordinates, dtype=float)
+    labels = cluster_frame(coordinates, radius)
+    cluster_ids, cluster_index = np.unique(labels, return_inverse=True)
+
+    if method == 'centroid':
+        sums = np.zeros((len(cluster_ids), coordinates.shape[1]))
+        np.add.at(sums, cluster_index, coordinates)
+        counts = np.bincount(cluster_index, minlength=len(cluster_ids))
+        merged = sums / counts[:, np.newaxis]
+
+    elif method == 'max':
+        assert confidences is not None, "Confidences are required to merge by maximum confidence."
+        confidences = np.asarray(confidences, dtype=float)
+        assert confidences.shape == labels.shape, "Confidences do not match the detections."
+
+        # Sort by cluster, then by descending confidence, and take the first of each cluster
+        order = np.lexsort((-confidences, cluster_index))
+        first = np.searchsorted(cluster_index[order], np.arange(len(cluster_ids)))
+        merged = coordinates[order[first]]
+
+    else:
+        raise ValueError(f"Unknown merge method: {method}")
+
+    return merged
+
+
+def iter_merged_detections(detections, radius, method='centroid', confidences=None):
+    """
+    Merge near-duplicate detections within the radius in each frame.
+    Detections are an iterable of per-frame lists of coordinates, as returned by read_uv_csv.
+    Confidences, if provided, are a list of per-frame lists of detection confidences.
+    Yields the merged detections of each frame in the same format.
+    """
+    assert radius > 0, "Radius must be positive."
+    for frame_index, frame in enumerate(detections):
+        if len(frame) == 0:
+            yield []
+            continue
+
+        frame_confidences = None if confidences is None else confidences[frame_index]
+        merged = merge_frame(frame, radius, method=method, confidences=frame_confidences)
+        yield merged.tolist()
+
+
+def merge_detections(detections, radius, method='centroid', confidences=None):
+    """Merge near-duplicate detections within the radius in each frame (see iter_merged_detections)."""
+    return list(iter_merged_detections(detections, radius, method=method, confidences=confidences))
+
+
+class SpatialIndex:
+    """Uniform grid index of the detections in each frame."""
+    def __init__(self, detections, cell_size):
+        assert cell_size > 0, "Cell size must be positive."
+        self.__cell_size = cell_size
+        self.__coordinates = []
+        self.__cells = []
+        for frame in detections:
+            coordinates = np.asarray(frame, dtype=float)
+            self.__coordinates.append(coordinates)
+            self.__cells.append(self.__build_cells(coordinates))
+
+    def __len__(self):
+        return len(self.__cells)
+
+    def __build_cells(self, coordinates):
+        """Map each occupied grid cell to the indices of its detections."""
+        if len(coordinates) == 0:
+            return {}
+
+        cells = np.floor(coordinates / self.__cell_size).astype(np.int64)
+        unique_cells, cell_index = np.unique(cells, axis=0, return_inverse=True)
+        cell_index = cell_index.ravel()
+        order = np.argsort(cell_index, kind='stable')
+        splits = np.cumsum(np.bincount(cell_index, minlength=len(unique_cells)))[:-1]
+
+        return dict(zip(map(tuple, unique_cells.tolist()), np.split(order, splits)))
+
+    def query(self, frame_index, point, radius):
+        """Return the indices of the detections in a frame within the radius of a point."""
+        cells = self.__cells[frame_index]
+        if not cells:
+            return np.zeros(0, dtype=np.intp)
+
+        # Gather candidates from the cells overlapping the query radius
+        point = np.asarray(point, dtype=float)
+        low = np.floor((point - radius) / self.__cell_size).astype(np.int64)
+        high = np.floor((point + radius) / self.__cell_size).astype(np.int64)
+        if np.prod(high - low + 1) <= len(cells):
+            candidates = [cells[cell] for cell in product(*map(range, low, high + 1)) if cell in cells]
+        else:
+            # Fewer occupied cells than cells in range: scan the occupied cells instead
+            candidates = [indices for cell, indices in cells.items()
+                          if np.all(np.asarray(cell) >= low) and np.all(np.asarray(cell) <= high)]
+        if not candidates:
+            return np.zeros(0, dtype=np.intp)
+
+        # Filter the candidates by the exact distance
+        candidates = np.sort(np.concatenate(candidates))
+        offsets = self.__coordinates[frame_index][candidates] - point
+
+        return candidates[np.einsum('ij,ij->i', offsets, offsets) <= radius ** 2]
+
+
+def preprocess(detections, radius, method='centroid', confidences=None):
+    """
+    Run the preprocessing stage between read_uv_csv and MHT.
+    Returns the merged detections and a spatial index of the merged detections.
+    """
+    merged_detections = merge_detections(detections, radius, method=method, confidences=confidences)
+
+    return merged_detections, SpatialIndex(merged_detections, radius)
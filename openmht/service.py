@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+
+"""
+Multi-stream tracking service.
+
+Clients connect over a local TCP or Unix socket and exchange newline-delimited
+JSON messages:
+
+    {"op": "frame", "stream": "cam1", "detections": [[u, v], ...]}
+        Queue the detections of the next frame of a stream.
+    {"op": "subscribe", "stream": "cam1"}
+        Receive {"op": "tracks", "stream", "frame", "tracks": [[track, u, v], ...]}
+        messages for each committed frame of the stream. A frame is committed
+        once it falls N frames behind the latest frame (see the n parameter).
+        The track ID is the stream-wide ID of the first detection of the track,
+        so the rows of a track can be linked across frames. A committed track
+        that is later pruned (e.g. by the nmiss parameter) is not retracted.
+    {"op": "close", "stream": "cam1"}
+        Process the queued frames, publish the remaining frames and remove the
+        stream. Replies {"op": "closed", "stream", "frames"}.
+    {"op": "stats"}
+        Replies {"op": "stats", "streams": {...}} with the processed frame count,
+        queue depth and latency of each stream.
+
+Errors are reported as {"op": "error", "message"}.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from .cli import read_parameters
+from .mht import MHT
+
+__author__ = "Jon Perdomo"
+__license__ = "GPL-3.0"
+
+# Trackers of the streams assigned to a worker process, keyed by stream name
+_trackers = {}
+
+
+def _open_stream(name, params):
+    """Create the tracker of a stream in the worker process."""
+    logging.getLogger().setLevel(logging.WARNING)
+    _trackers[name] = MHT([], params)
+
+
+def _solution_rows(mht, frame_index):
+    """Return the [track, u, v] rows of the solution tracks detected in a frame, by track ID."""
+    detection_ids = mht.get_solution_detections()[:, frame_index]
+    coordinates = mht.get_detection_coordinates()
+
+    return sorted([track_id] + coordinates[detection_id].tolist()
+                  for track_id, detection_id in zip(mht.get_solution_track_ids().tolist(), detection_ids.tolist())
+                  if detection_id >= 0)
+
+
+def _process_frame(name, detections, n_scan):
+    """
+    Update the tracker of a stream with the next frame in the worker process.
+    Returns the index and rows of the newly committed frame, or None.
+    """
+    mht = _trackers[name]
+    mht.update(detections)
+    committed_frame = mht.get_frame_count() - 1 - n_scan
+    if committed_frame < 0:
+        return None
+
+    return committed_frame, _solution_rows(mht, committed_frame)
+
+
+def _close_stream(name, first_frame):
+    """Remove the tracker of a stream. Returns the rows of its frames from first_frame onward."""
+    mht = _trackers.pop(name)
+
+    return [(frame_index, _solution_rows(mht, frame_index))
+            for frame_index in range(first_frame, mht.get_frame_count())]
+
+
+class _Stream:
+    """State of a named stream in the service."""
+    def __init__(self, name, worker, queue_size):
+        self.name = name
+        self.worker = worker  # Worker process executor holding the tracker
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.subscribers = set()
+        self.task = None
+        self.frames = 0
+        self.next_frame = 0  # Next frame to publish
+        self.latency_total = 0.
+        self.latency_max = 0.
+        self.latency_last = 0.
+
+    def get_stats(self):
+        """Return the stream statistics."""
+        return {
+            'frames': self.frames,
+            'queue_depth': self.queue.qsize(),
+            'latency_last': self.latency_last,
+            'latency_mean': self.latency_total / self.frames if self.frames else 0.,
+            'latency_max': self.latency_max,
+        }
+
+
+class TrackingService:
+    """
+    Track many named streams concurrently, one incremental MHT per stream.
+    Frames are processed in a pool of worker processes, with each stream pinned
+    to one worker so that its tracker stays in memory between frames. A heavy
+    stream therefore only delays the streams sharing its worker.
+    """
+    def __init__(self, params, workers=4, queue_size=64):
+        self.__params = params
+        self.__queue_size = queue_size
+        self.__workers = [ProcessPoolExecutor(max_workers=1) for _ in range(workers)]
+        self.__streams = {}
+
+    async def submit(self, name, detections):
+        """Queue a frame of a stream, waiting while the stream queue is full."""
+        stream = self.__streams.get(name)
+        if stream is None:
+            stream = await self.__open(name)
+
+        await stream.queue.put((time.time(), detections))
+
+    def subscribe(self, name, writer):
+        """Send the committed frames of a stream to a client."""
+        stream = self.__streams.get(name)
+        if stream is None:
+            raise KeyError(f"Unknown stream: {name}")
+
+        stream.subscribers.add(writer)
+
+    def unsubscribe(self, writer):
+        """Stop sending frames to a client."""
+        for stream in self.__streams.values():
+            stream.subscribers.discard(writer)
+
+    def get_stats(self):
+        """Return the statistics of each stream."""
+        return {name: stream.get_stats() for name, stream in self.__streams.items()}
+
+    async def __open(self, name):
+        """Create a stream on the least loaded worker."""
+        loads = {id(worker): 0 for worker in self.__workers}
+        for stream in self.__streams.values():
+            loads[id(stream.worker)] += 1
+
+        worker = min(self.__workers, key=lambda w: loads[id(w)])
+        stream = _Stream(name, worker, self.__queue_size)
+        self.__streams[name] = stream
+
+        # Start the stream task before awaiting, so a registered stream always has a task. The
+        # tracker is created first as the worker runs its calls in submission order.
+        opened = asyncio.get_running_loop().run_in_executor(worker, _open_stream, name, self.__params)
+        stream.task = asyncio.create_task(self.__run_stream(stream))
+        await opened
+        logging.info("[service] Opened stream %s", name)
+
+        return stream
+
+    async def __run_stream(self, stream):
+        """Process the queued frames of a stream in order."""
+        loop = asyncio.get_running_loop()
+        n_scan = int(self.__params.get('n'))
+        while True:
+            received, detections = await stream.queue.get()
+            try:
+                committed = await loop.run_in_executor(stream.worker, _process_frame, stream.name,
+                                                       detections, n_scan)
+                if committed is not None:
+                    await self.__publish(stream, *committed)
+
+            except Exception as exc:  # pylint: disable=broad-except
+                logging.error("[service] Stream %s failed: %s", stream.name, exc)
+                await self.__publish_message(stream, {'op': 'error', 'stream': stream.name, 'message': str(exc)})
+
+            finally:
+                latency = time.time() - received
+                stream.frames += 1
+                stream.latency_last = latency
+                stream.latency_total += latency
+                stream.latency_max = max(stream.latency_max, latency)
+                stream.queue.task_done()
+
+    async def __publish(self, stream, frame_index, rows):
+        stream.next_frame = frame_index + 1
+        await self.__publish_message(stream, {'op': 'tracks', 'stream': stream.name,
+                                              'frame': frame_index, 'tracks': rows})
+
+    async def __publish_message(self, stream, message):
+        data = (json.dumps(message) + '\n').encode()
+        for writer in list(stream.subscribers):
+            try:
+                writer.write(data)
+                await writer.drain()
+            except ConnectionError:
+                stream.subscribers.discard(writer)
+
+    async def close_stream(self, name):
+        """Process the queued frames of a stream, publish its remaining frames and remove it."""
+        stream = self.__streams.get(name)
+        if stream is None:
+            raise KeyError(f"Unknown stream: {name}")
+
+        await stream.queue.join()
+        stream.task.cancel()
+        del self.__streams[name]
+        remaining = await asyncio.get_running_loop().run_in_executor(stream.worker, _close_stream, name,
+                                                                     stream.next_frame)
+        for frame_index, rows in remaining:
+            await self.__publish(stream, frame_index, rows)
+
+        logging.info("[service] Closed stream %s after %d frames", name, stream.frames)
+
+        return stream.frames
+
+    async def handle_client(self, reader, writer):
+        """Handle the messages of a client connection."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                try:
+                    reply = await self.__handle_message(json.loads(line), writer)
+                except (ValueError, KeyError, TypeError) as exc:
+                    reply = {'op': 'error', 'message': str(exc)}
+
+                if reply is not None:
+                    writer.write((json.dumps(reply) + '\n').encode())
+                    await writer.drain()
+
+        except ConnectionError:
+            pass
+
+        finally:
+            self.unsubscribe(writer)
+            writer.close()
+
+    async def __handle_message(self, message, writer):
+        """Handle a single message. Returns the reply, or None."""
+        op = message['op']
+        if op == 'frame':
+            await self.submit(message['stream'], message['detections'])
+            return None
+
+        if op == 'subscribe':
+            if message['stream'] not in self.__streams:
+                await self.__open(message['stream'])
+
+            self.subscribe(message['stream'], writer)
+            return None
+
+        if op == 'close':
+            frames = await self.close_stream(message['stream'])
+            return {'op': 'closed', 'stream': message['stream'], 'frames': frames}
+
+        if op == 'stats':
+            return {'op': 'stats', 'streams': self.get_stats()}
+
+        raise ValueError(f"Unknown op: {op}")
+
+    async def shutdown(self):
+        """Stop all streams and worker processes."""
+        for stream in self.__streams.values():
+            stream.task.cancel()
+
+        self.__streams.clear()
+
+        # Wait for the worker processes without blocking the event loop
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(None, worker.shutdown) for worker in self.__workers])
+
+
+async def serve(params, host='127.0.0.1', port=8765, unix_path=None, workers=4, queue_size=64):
+    """Run the tracking service until cancelled."""
+    service = TrackingService(params, workers=workers, queue_size=queue_size)
+    if unix_path is not None:
+        server = await asyncio.start_unix_server(service.handle_client, path=unix_path)
+        logging.info("[service] Listening on %s", unix_path)
+    else:
+        server = await asyncio.start_server(service.handle_client, host=host, port=port)
+        logging.info("[service] Listening on %s:%d", host, port)
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.shutdown()
+
+
+def run(cli_args=None):
+    """Read in the command line parameters and run the tracking service."""
+    parser = argparse.ArgumentParser(description="Run the OpenMHT multi-stream tracking service.")
+    parser.add_argument('pfile', help="Path to the parameter text file")
+    parser.add_argument('--host', default='127.0.0.1', help="TCP host (Default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="TCP port (Default: 8765)")
+    parser.add_argument('--unix', help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument('-j', '--workers', type=int, default=4, help="Number of worker processes")
+    parser.add_argument('--queue-size', type=int, default=64, help="Maximum queued frames per stream")
+    args = parser.parse_args(cli_args)
+
+    try:
+        params = read_parameters(args.pfile)
+    except AssertionError as param_error:
+        print(param_error)
+        sys.exit(2)
+
+    try:
+        asyncio.run(serve(params, host=args.host, port=args.port, unix_path=args.unix,
+                          workers=args.workers, queue_size=args.queue_size))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    """Run the tracking service command line interface."""
+    run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+
+"""Parameter sweep: run MHT over parameter ranges in parallel and rank the settings against ground truth tracks."""
+
+import argparse
+import atexit
+import csv
+import itertools
+import logging
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .cli import read_parameters, read_uv_csv
+from .mht import MHT
+
+__author__ = "Jon Perdomo"
+__license__ = "GPL-3.0"
+
+SWEEP_KEYS = ["dth", "q", "r", "pd", "n", "bth", "nmiss", "v", "k", "nmerge", "mtol"]
+RESULT_HEADER = ["rank", "f1", "precision", "recall", "seconds"]
+
+# Worker process state, set by _init_worker
+_shared_memory = []
+_detections = None
+_truth_links = None
+
+
+def parse_range(text):
+    """
+    Parse a parameter range, either a comma separated list of values (e.g. 500,1000)
+    or start:stop:step with an inclusive stop (e.g. 1:3:1).
+    Returns the list of values.
+    """
+    if ':' in text:
+        start, stop, step = [float(x) for x in text.split(':')]
+        if step <= 0:
+            raise ValueError(f"Range step must be positive: {text}")
+
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return [start + i * step for i in range(max(count, 0))]
+
+    return [float(x) for x in text.split(',')]
+
+
+def track_links(solution_coordinates):
+    """
+    Return the set of links between consecutive detections of each track, where
+    each link is a pair of (frame, coordinates) tuples.
+    """
+    links = set()
+    for track_coordinates in solution_coordinates:
+        previous = None
+        for frame_index, coordinate in enumerate(track_coordinates):
+            if coordinate is None:
+                continue
+
+            current = (frame_index, tuple(coordinate))
+            if previous is not None:
+                links.add((previous, current))
+
+            previous = current
+
+    return links
+
+
+def read_track_csv(file_path):
+    """Read tracks from an output CSV into the MHT.run() solution format."""
+    tracks = {}
+    with open(file_path, encoding='utf-8-sig') as csv_file:
+        csv_reader = csv.reader(csv_file, delimiter=',')
+        next(csv_reader)  # Skip the header
+        for row in csv_reader:
+            frame_index, track_index = int(row[0]), int(row[1])
+            coordinate = None if row[2] == 'None' else [float(row[2]), float(row[3])]
+            track_coordinates = tracks.setdefault(track_index, [])
+            track_coordinates.extend([None] * (frame_index + 1 - len(track_coordinates)))
+            track_coordinates[frame_index] = coordinate
+
+    return [tracks[track_index] for track_index in sorted(tracks)]
+
+
+def score_links(links, truth_links):
+    """Return the F1 score, precision and recall of the links with respect to the ground truth links."""
+    matched = len(links & truth_links)
+    precision = matched / len(links) if links else 0.
+    recall = matched / len(truth_links) if truth_links else 0.
+    f1 = 2 * precision * recall / (precision + recall) if matched else 0.
+
+    return f1, precision, recall
+
+
+def _init_worker(coordinates_name, offsets_name, coordinate_shape, frame_count, truth_links):
+    """
+    Attach to the shared memory blocks once per worker. The per-frame detections are
+    views of the shared coordinates, so the blocks stay open for the life of the worker.
+    """
+    global _detections, _truth_links  # pylint: disable=global-statement
+    logging.getLogger().setLevel(logging.WARNING)
+    coordinates_memory = shared_memory.SharedMemory(name=coordinates_name)
+    offsets_memory = shared_memory.SharedMemory(name=offsets_name)
+    _shared_memory[:] = [coordinates_memory, offsets_memory]
+    atexit.register(_close_worker)
+
+    coordinates = np.ndarray(coordinate_shape, dtype=np.float64, buffer=coordinates_memory.buf)
+    offsets = np.ndarray((frame_count + 1,), dtype=np.int64, buffer=offsets_memory.buf).tolist()
+    _detections = [coordinates[offsets[i]:offsets[i + 1]] for i in range(frame_count)]
+    _truth_links = truth_links
+
+
+def _close_worker():
+    """Release the views of the shared memory blocks and close them."""
+    global _detections  # pylint: disable=global-statement
+    _detections = None
+    for memory in _shared_memory:
+        memory.close()
+
+    del _shared_memory[:]
+
+
+def _run_setting(params):
+    """Run MHT with one parameter setting and score it against the ground truth."""
+    start = time.time()
+    solution_coordinates = MHT(_detections, params).run()
+    elapsed_seconds = time.time() - start
+
+    return score_links(track_links(solution_coordinates), _truth_links) + (elapsed_seconds,)
+
+
+def sweep(detections, base_params, param_ranges, truth_coordinates, workers=None):
+    """
+    Run MHT for every combination of the parameter ranges across a process pool.
+    The detections are shared with the workers through shared memory.
+    Returns the results as (params, f1, precision, recall, seconds) tuples,
+    ranked by descending F1 score and then by runtime.
+    """
+    settings = []
+    keys = list(param_ranges)
+    for values in itertools.product(*[param_ranges[key] for key in keys]):
+        params = dict(base_params)
+        params.update(zip(keys, values))
+        settings.append(params)
+
+    # Flatten the detections into a coordinate array with per-frame offsets
+    frame_sizes = [len(frame) for frame in detections]
+    offsets = np.zeros(len(detections) + 1, dtype=np.int64)
+    np.cumsum(frame_sizes, out=offsets[1:])
+    coordinates = np.array([coordinate for frame in detections for coordinate in frame], dtype=np.float64)
+
+    coordinates_memory = shared_memory.SharedMemory(create=True, size=max(coordinates.nbytes, 1))
+    offsets_memory = shared_memory.SharedMemory(create=True, size=offsets.nbytes)
+    try:
+        np.ndarray(coordinates.shape, dtype=np.float64, buffer=coordinates_memory.buf)[:] = coordinates
+        np.ndarray(offsets.shape, dtype=np.int64, buffer=offsets_memory.buf)[:] = offsets
+        initargs = (coordinates_memory.name, offsets_memory.name, coordinates.shape, len(detections),
+                    track_links(truth_coordinates))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+            scores = list(executor.map(_run_setting, settings))
+
+    finally:
+        coordinates_memory.close()
+        coordinates_memory.unlink()
+        offsets_memory.close()
+        offsets_memory.unlink()
+
+    results = [(params,) + score for params, score in zip(settings, scores)]
+    results.sort(key=lambda result: (-result[1], result[4]))
+
+    return results
+
+
+def write_results(results, param_keys, file=None):
+    """Write the ranked results as a CSV table (Default: stdout)."""
+    writer = csv.writer(sys.stdout if file is None else file, lineterminator='\n')
+    writer.writerow(RESULT_HEADER + param_keys)
+    for rank, (params, f1, precision, recall, seconds) in enumerate(results, start=1):
+        writer.writerow([rank, f"{f1:.4f}", f"{precision:.4f}", f"{recall:.4f}", f"{seconds:.3f}"]
+                        + [params[key] for key in param_keys])
+
+
+def run(cli_args=None):
+    """Read in the command line parameters and run the parameter sweep."""
+    parser = argparse.ArgumentParser(description="Run OpenMHT over parameter ranges and rank the results.")
+    parser.add_argument('ifile', help="Input CSV file path")
+    parser.add_argument('pfile', help="Path to the parameter text file with the base parameters")
+    parser.add_argument('tfile', help="Ground truth track CSV file path (same format as the output CSV)")
+    parser.add_argument('-o', '--ofile', help="Output CSV file path for the ranked results (Default: stdout)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Number of worker processes")
+    for key in SWEEP_KEYS:
+        parser.add_argument(f'--{key}', type=parse_range, metavar='RANGE',
+                            help=f"Values of {key} as a comma separated list or start:stop:step")
+
+    args = parser.parse_args(cli_args)
+    try:
+        base_params = read_parameters(args.pfile)
+    except AssertionError as param_error:
+        print(param_error)
+        sys.exit(2)
+
+    param_ranges = {key: getattr(args, key) for key in SWEEP_KEYS if getattr(args, key) is not None}
+    detections = read_uv_csv(args.ifile)
+    truth_coordinates = read_track_csv(args.tfile)
+
+    logging.info("Sweeping %d parameter setting(s)...",
+                 int(np.prod([len(values) for values in param_ranges.values()])))
+    results = sweep(detections, base_params, param_ranges, truth_coordinates, workers=args.workers)
+
+    param_keys = list(param_ranges) or ["dth"]
+    if args.ofile:
+        with open(args.ofile, 'w', encoding='utf-8') as result_file:
+            write_results(results, param_keys, result_file)
+
+        logging.info("Results saved to %s", args.ofile)
+    else:
+        write_results(results, param_keys)
+
+    return results
+
+
+def main():
+    """Run the parameter sweep command line interface."""
+    run()
+
+
+if __name__ == '__main__':
+    main()
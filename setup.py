@@ -19,10 +19,12 @@ setuptools.setup(
         "License :: OSI Approved :: GNU Affero General Public License v3",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.8',
     entry_points={
         'console_scripts': [
             'openmht = openmht.__main__:main',
+            'openmht-sweep = openmht.sweep:main',
+            'openmht-service = openmht.service:main',
         ]
     },
 )
@@ -0,0 +1,78 @@
+import csv
+import os
+from pathlib import Path
+
+import numpy as np
+
+from openmht import cli
+from openmht.arrays import array_to_solution, run_arrays, to_records
+from openmht.mht import MHT
+
+
+ROOT_DIR = str(Path(__file__).parent.parent)
+TEST_DATA_PATH = os.path.join(ROOT_DIR, "SampleData")
+TEST_FILE_PATH = os.path.join(TEST_DATA_PATH, "SampleInput.csv")
+PARAM_FILE_PATH = os.path.join(ROOT_DIR, "params.txt")
+TRUTH_FILE_PATH = os.path.join(TEST_DATA_PATH, "SampleOutput.csv")
+
+
+def test_run_arrays():
+    """Test that the array interface matches MHT.run() for both detection layouts."""
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    solution = MHT(detections, params).run()
+
+    # Single (frame, u, v) array with shifted frame numbers
+    rows = np.array([[frame_index + 10] + coordinate for frame_index, frame in enumerate(detections)
+                     for coordinate in frame])
+    tracks, track_ids, frame_numbers = run_arrays(rows, params)
+    assert tracks.shape == (len(solution), len(detections), 2)
+    assert array_to_solution(tracks) == solution
+    np.testing.assert_array_equal(frame_numbers, np.arange(len(detections)) + 10)
+
+    # Each track ID is the ID of the first detection of the track
+    first_frames = [next(i for i, coordinate in enumerate(track) if coordinate is not None) for track in solution]
+    offsets = np.cumsum([0] + [len(frame) for frame in detections])
+    for track_id, track, first_frame in zip(track_ids, solution, first_frames):
+        assert offsets[first_frame] <= track_id < offsets[first_frame + 1]
+        assert detections[first_frame][track_id - offsets[first_frame]] == track[first_frame]
+
+    # Sequence of per-frame arrays
+    tracks, _, frame_numbers = run_arrays([np.array(frame) for frame in detections], params)
+    assert array_to_solution(tracks) == solution
+    np.testing.assert_array_equal(frame_numbers, np.arange(len(detections)))
+
+
+def test_run_arrays_empty_frames():
+    """Test that empty frames given as empty lists match MHT.run()."""
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    detections = [[]] + detections[:3] + [[]] + detections[3:]
+    solution = MHT(detections, params).run()
+
+    tracks, _, frame_numbers = run_arrays([np.array(frame) for frame in detections[:1]] + detections[1:], params)
+    assert array_to_solution(tracks) == solution
+    assert len(frame_numbers) == len(detections)
+
+
+def test_to_records():
+    """Test that the structured array matches the output CSV layout."""
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    tracks, track_ids, frame_numbers = run_arrays([np.array(frame) for frame in detections], params)
+    records = to_records(tracks, frame_numbers)
+
+    with open(TRUTH_FILE_PATH, encoding="utf-8-sig") as f:
+        truth = list(csv.reader(f))[1:]
+
+    assert len(records) == len(truth)
+    for record, row in zip(records, truth):
+        assert (record['frame'], record['track']) == (int(row[0]), int(row[1]))
+        if row[2] == 'None':
+            assert np.isnan(record['u']) and np.isnan(record['v'])
+        else:
+            assert (record['u'], record['v']) == (float(row[2]), float(row[3]))
+
+    # Track IDs in place of the track index
+    records = to_records(tracks, frame_numbers, track_ids)
+    np.testing.assert_array_equal(records['track'], np.tile(track_ids, len(detections)))
@@ -0,0 +1,85 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from openmht import cli
+from openmht.cache import ResultCache, cache_key
+from openmht.mht import MHT
+
+
+ROOT_DIR = str(Path(__file__).parent.parent)
+TEST_FILE_PATH = os.path.join(ROOT_DIR, "SampleData", "SampleInput.csv")
+PARAM_FILE_PATH = os.path.join(ROOT_DIR, "params.txt")
+
+
+def test_cache_hit(tmp_path, monkeypatch):
+    """Test that a cached result matches MHT.run() and skips tracking."""
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    cache = ResultCache(tmp_path)
+
+    solution = cache.run(detections, params)
+    assert solution == MHT(detections, params).run()
+
+    def fail(self):
+        raise AssertionError("MHT should not run on a cache hit.")
+
+    monkeypatch.setattr(MHT, "run", fail)
+    assert cache.run(detections, params) == solution
+
+
+def test_cache_key():
+    """Test that the cache key depends on the detections, parameters and version."""
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    key = cache_key(detections, params, version="1.0")
+
+    assert key == cache_key([list(frame) for frame in detections], dict(params), version="1.0")
+    assert key != cache_key(detections, params, version="2.0")
+    assert key != cache_key(detections, dict(params, dth=500), version="1.0")
+    assert key != cache_key(detections[:-1], params, version="1.0")
+    assert key != cache_key([detections[0][:1], detections[0][1:]] + detections[1:], params, version="1.0")
+
+
+def test_cache_eviction(tmp_path):
+    """Test that the least recently used results are evicted."""
+    cache = ResultCache(tmp_path, max_bytes=120)  # Room for two entries
+    solution = [[[0.5, 0.25], None]] * 5
+
+    cache.put("a", solution)
+    cache.put("b", solution)
+    os.utime(tmp_path / "a.json.gz", (0, 0))
+    os.utime(tmp_path / "b.json.gz", (1, 1))
+    assert cache.get("a") == solution  # Refreshes "a"
+    cache.put("c", solution)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == solution
+    assert cache.get("c") == solution
+
+
+def test_cli_cache(tmp_path):
+    """Test the command line cache options."""
+    output_file = str(tmp_path / "output.csv")
+    args = [TEST_FILE_PATH, output_file, PARAM_FILE_PATH, "--cache-dir", str(tmp_path / "cache")]
+    cli.run(args)
+    cli.run(args)
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    cli.run(args + ["--no-cache"])
+    with pytest.raises(SystemExit):
+        cli.run(args + ["--cache-size", "x"])
+
+
+def test_cache_corrupt_entry(tmp_path):
+    """Test that truncated and invalid entries are treated as misses and removed."""
+    cache = ResultCache(tmp_path)
+    cache.put("truncated", [[[0.1, 0.2]]])
+    path = next(tmp_path.glob("truncated*"))
+    path.write_bytes(path.read_bytes()[:-10])
+    (tmp_path / path.name.replace("truncated", "invalid")).write_bytes(b"not gzip")
+
+    for key in ("truncated", "invalid"):
+        assert cache.get(key) is None
+        assert not list(tmp_path.glob(key + "*"))
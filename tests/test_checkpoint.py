@@ -0,0 +1,110 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from openmht import cli
+from openmht.checkpoint import Checkpointer, load_checkpoint, save_checkpoint
+from openmht.mht import MHT
+
+
+ROOT_DIR = str(Path(__file__).parent.parent)
+TEST_DATA_PATH = os.path.join(ROOT_DIR, "SampleData")
+TEST_FILE_PATH = os.path.join(TEST_DATA_PATH, "SampleInput.csv")
+PARAM_FILE_PATH = os.path.join(ROOT_DIR, "params.txt")
+TRUTH_FILE_PATH = os.path.join(TEST_DATA_PATH, "SampleOutput.csv")
+
+
+def test_resume(tmp_path):
+    """Test that resuming from a checkpoint at any frame matches an uninterrupted run."""
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    solution = MHT(detections, params).run()
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+
+    for frame_count in range(1, len(detections)):
+        # Interrupted run
+        checkpointer = Checkpointer(checkpoint_path, every_frames=frame_count)
+        MHT(detections[:frame_count], params).run(checkpointer)
+        checkpointer.wait()
+
+        # Resumed run
+        checkpoint = load_checkpoint(checkpoint_path)
+        assert int(checkpoint['frame_index']) == frame_count
+        mht = MHT(detections, params)
+        mht.set_checkpoint(checkpoint)
+        assert mht.run() == solution
+
+
+def test_checkpoint_round_trip(tmp_path):
+    """Test that a saved checkpoint restores the same tracker state."""
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    params["nmerge"] = 2
+    mht = MHT(detections[:4], params)
+    mht.run()
+
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+    save_checkpoint(checkpoint_path, mht.get_checkpoint())
+    restored = MHT([], params)
+    restored.set_checkpoint(load_checkpoint(checkpoint_path))
+
+    checkpoint, restored_checkpoint = mht.get_checkpoint(), restored.get_checkpoint()
+    assert checkpoint.keys() == restored_checkpoint.keys()
+    for key, value in checkpoint.items():
+        assert (value == restored_checkpoint[key]).all(), key
+
+
+def test_cli_resume(tmp_path):
+    """Test resuming the command line interface from a checkpoint."""
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+    output_file = str(tmp_path / "output.csv")
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    checkpointer = Checkpointer(checkpoint_path, every_frames=5)
+    MHT(detections[:5], params).run(checkpointer)
+    checkpointer.wait()
+
+    cli.run([TEST_FILE_PATH, output_file, PARAM_FILE_PATH, "-c", checkpoint_path, "--resume"])
+
+    with open(output_file, encoding="utf-8") as f:
+        output = f.read()
+
+    with open(TRUTH_FILE_PATH, encoding="utf-8") as f:
+        truth = f.read()
+
+    assert output == truth
+
+
+def test_resume_mismatch(tmp_path):
+    """Test that resuming against a different input is refused."""
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    checkpointer = Checkpointer(checkpoint_path, every_frames=5)
+    MHT(detections[:5], params).run(checkpointer)
+    checkpointer.wait()
+    checkpoint = load_checkpoint(checkpoint_path)
+
+    # Changed detection, missing detection and truncated input
+    changed = [[list(detection) for detection in frame] for frame in detections]
+    changed[3][0][0] += 1e-6
+    for other_detections in (changed, detections[:2] + [detections[2][1:]] + detections[3:], detections[:4]):
+        mht = MHT(other_detections, params)
+        mht.set_checkpoint(checkpoint)
+        with pytest.raises(AssertionError, match="Checkpoint detections do not match|fewer than"):
+            mht.run()
+
+    # Resuming the command line interface with merged detections
+    with pytest.raises(SystemExit):
+        cli.run([TEST_FILE_PATH, str(tmp_path / "output.csv"), PARAM_FILE_PATH, "-c", checkpoint_path, "--resume",
+                 "--merge-radius", "0.5"])
+
+
+def test_cli_checkpoint_interval(tmp_path):
+    """Test that checkpointing without a frame or time interval is rejected."""
+    with pytest.raises(SystemExit) as exit_info:
+        cli.run([TEST_FILE_PATH, str(tmp_path / "output.csv"), PARAM_FILE_PATH, "-c", str(tmp_path / "ck.npz"),
+                 "--checkpoint-frames", "0"])
+
+    assert exit_info.value.code == 2
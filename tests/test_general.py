@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 
 from openmht import cli
+from openmht.mht import MHT
 
 
 # Get the root directory of the project
@@ -41,4 +42,114 @@ def test_basic():
     # Compare the output to the truth
     for i, line in enumerate(output):
         assert line == truth[i]
-    
\ No newline at end of file
+    
+
+def test_branch_merging():
+    """Test that merging branches with identical recent history preserves the solution."""
+
+    # Read the sample data and parameters
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    assert params["nmerge"] == 0 and params["mtol"] == 0
+
+    # Run MHT with and without branch merging
+    solution = MHT(detections, params).run()
+    params["nmerge"] = 2
+    params["mtol"] = 1e-3
+    merged_solution = MHT(detections, params).run()
+
+    assert merged_solution == solution
+
+
+def test_empty_frames():
+    """Test that frames without detections are tracked as missed detections."""
+
+    # Read the sample data and parameters, and insert empty frames
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    detections = [[]] + detections[:2] + [[]] + detections[2:]
+
+    # Run MHT frame by frame
+    mht = MHT([], params)
+    for frame in detections:
+        mht.update(frame)
+
+    solution = mht.get_solution()
+
+    assert len(solution) > 0
+    for track in solution:
+        assert len(track) <= len(detections)
+        assert track[0] is None
+
+
+def test_pruning_regression():
+    """Test the solution with empty frames, n-miss pruning and B-threshold pruning against a pinned output."""
+
+    # Two crossing targets with empty frames, and clutter detections
+    detections = [[[10., 10.], [50., 50.]], [[11., 11.], [51., 52.]], [], [[13., 13.], [53., 54.], [90., 10.]], [],
+                  [[15., 15.]], [[16., 16.], [55., 58.]], [[17., 17.], [91., 12.]]]
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    params.update(n=3, nmiss=2, bth=100)
+
+    # Without pruning by the B-threshold
+    assert MHT(detections, params).run() == [
+        [None, None, None, [90., 10.], None, None, [55., 58.], [91., 12.]],
+        [None, None, None, None, None, [15., 15.], [16., 16.], None],
+        [None, None, None, None, None, None, None, [17., 17.]]]
+
+    # With pruning by a (float) B-threshold
+    params['bth'] = 2.
+    assert MHT(detections, params).run() == [
+        [None, None, None, [13., 13.], None, [15., 15.], [55., 58.], [91., 12.]],
+        [None, None, None, None, None, None, [16., 16.], [17., 17.]]]
+
+
+def track_with_duplicates():
+    """Return frames of two targets, with a near-duplicate detection of the first target in the first frame."""
+    detections = [[[0.1, 0.2], [0.1001, 0.2], [0.8, 0.5]]]
+    for i in range(1, 6):
+        detections.append([[0.1 + 0.01 * i, 0.2 + 0.01 * i], [0.8 - 0.01 * i, 0.5]])
+
+    return detections
+
+
+def run_branch_counts(detections, params):
+    """Run MHT frame by frame. Returns the branch count after each frame and the solution."""
+    mht = MHT([], params)
+    branch_counts = []
+    for frame in detections:
+        mht.update(frame)
+        branch_counts.append(mht.get_branch_count())
+
+    return branch_counts, mht.get_solution()
+
+
+def test_merge_by_history():
+    """Test that branches with the same last N_merge detections are merged."""
+    detections = track_with_duplicates()
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    branch_counts, solution = run_branch_counts(detections, params)
+
+    params["nmerge"] = 2
+    merged_counts, merged_solution = run_branch_counts(detections, params)
+
+    # The branches continuing the duplicate detections are merged once their last two detections match
+    assert merged_counts[:2] == branch_counts[:2]
+    assert all(merged <= count for merged, count in zip(merged_counts, branch_counts))
+    assert merged_counts[2] < branch_counts[2]
+    assert sorted(merged_solution, key=str) == sorted(solution, key=str)
+
+
+def test_merge_by_state():
+    """Test that branches with the same current detection and a Kalman state within M_tol are merged."""
+    detections = track_with_duplicates()
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    branch_counts, solution = run_branch_counts(detections, params)
+
+    params["mtol"] = 1e-3
+    merged_counts, merged_solution = run_branch_counts(detections, params)
+
+    assert all(merged <= count for merged, count in zip(merged_counts, branch_counts))
+    assert merged_counts[2] < branch_counts[2]
+    assert sorted(merged_solution, key=str) == sorted(solution, key=str)
+    assert len(merged_solution) == 2
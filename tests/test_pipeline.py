@@ -0,0 +1,48 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from openmht import cli
+from openmht.pipeline import BackgroundReader
+
+
+ROOT_DIR = str(Path(__file__).parent.parent)
+TEST_FILE_PATH = os.path.join(ROOT_DIR, "SampleData", "SampleInput.csv")
+
+
+def test_background_reader():
+    """Test that the background reader yields the parsed frames in order."""
+    reader = BackgroundReader(cli.iter_uv_csv(TEST_FILE_PATH), queue_size=1)
+    assert list(reader) == cli.read_uv_csv(TEST_FILE_PATH)
+    reader.close()
+
+
+def test_background_reader_error():
+    """Test that errors raised while reading are propagated to the consumer."""
+    def frames():
+        yield [[0., 0.]]
+        raise ValueError("Malformed frame")
+
+    reader = BackgroundReader(frames())
+    with pytest.raises(ValueError, match="Malformed frame"):
+        for _ in reader:
+            pass
+
+    reader.close()
+
+
+def test_background_reader_backpressure():
+    """Test that closing the reader stops it while it is blocked on a full queue."""
+    consumed = []
+
+    def frames():
+        for i in range(1000):
+            consumed.append(i)
+            yield [[float(i), 0.]]
+
+    reader = BackgroundReader(frames(), queue_size=2)
+    assert next(iter(reader)) == [[0., 0.]]
+    reader.close()
+    assert len(consumed) < 10
+
@@ -0,0 +1,66 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from openmht import plot_tracks  # noqa: E402
+from openmht.sweep import read_track_csv  # noqa: E402
+
+
+ROOT_DIR = str(Path(__file__).parent.parent)
+TRUTH_FILE_PATH = os.path.join(ROOT_DIR, "SampleData", "SampleOutput.csv")
+
+
+def test_load_tracks():
+    """Test that the loaded arrays match the tracks in the CSV."""
+    tracks = plot_tracks.load_tracks(TRUTH_FILE_PATH)
+    truth = read_track_csv(TRUTH_FILE_PATH)
+
+    np.testing.assert_array_equal(tracks.ids, np.arange(len(truth)))
+    for track_id, start, length in zip(tracks.ids, tracks.starts, tracks.lengths):
+        expected = [[np.nan, np.nan] if coordinate is None else coordinate for coordinate in truth[track_id]]
+        np.testing.assert_array_equal(tracks.frames[start:start + length], np.arange(len(expected)))
+        np.testing.assert_array_equal(tracks.coordinates[start:start + length], expected)
+
+    # Parsing in chunks gives the same arrays
+    chunked = plot_tracks.load_tracks(TRUTH_FILE_PATH, chunk_size=3)
+    np.testing.assert_array_equal(chunked.frames, tracks.frames)
+    np.testing.assert_array_equal(chunked.coordinates, tracks.coordinates)
+
+
+def test_select():
+    """Test that selecting by frame range and track IDs keeps the matching rows."""
+    tracks = plot_tracks.load_tracks(TRUTH_FILE_PATH)
+    for frames in (None, (2, 5)):
+        for track_ids in (None, [2], [3, 0, 9], []):
+            selected = tracks.select(frames=frames, track_ids=track_ids)
+            mask = np.ones(len(tracks.frames), dtype=bool)
+            if frames is not None:
+                mask &= (tracks.frames >= frames[0]) & (tracks.frames <= frames[1])
+            if track_ids is not None:
+                mask &= np.isin(tracks.track_ids, track_ids)
+
+            np.testing.assert_array_equal(selected.track_ids, tracks.track_ids[mask])
+            np.testing.assert_array_equal(selected.frames, tracks.frames[mask])
+            np.testing.assert_array_equal(selected.coordinates, tracks.coordinates[mask])
+
+
+def test_decimate():
+    """Test that decimation keeps evenly spaced points and the last point of each track."""
+    tracks = plot_tracks.load_tracks(TRUTH_FILE_PATH).decimate(3)
+
+    np.testing.assert_array_equal(tracks.lengths, [4, 4, 4, 4])
+    np.testing.assert_array_equal(tracks.frames[:4], [0, 3, 6, 7])
+
+
+def test_export(tmp_path):
+    """Test exporting frame ranges and track thumbnails."""
+    paths = plot_tracks.run([TRUTH_FILE_PATH, str(tmp_path), "-f", "0:3", "-f", "4:7", "-t", "-j", "2"])
+
+    assert [os.path.basename(path) for path in paths] == [
+        "SampleOutput_Frames_0_3.png", "SampleOutput_Frames_4_7.png",
+        "Track_0.png", "Track_1.png", "Track_2.png", "Track_3.png"]
+    assert all(os.path.getsize(path) > 0 for path in paths)
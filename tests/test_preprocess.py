@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from openmht.preprocess import cluster_frame, merge_detections, preprocess
+
+
+DETECTIONS = [
+    [[0.10, 0.10], [0.11, 0.10], [0.50, 0.50]],
+    [[0.20, 0.20], [0.60, 0.60], [0.61, 0.61], [0.62, 0.62]],
+    [[0.30, 0.30]],
+]
+CONFIDENCES = [[0.2, 0.9, 0.5], [1.0, 0.1, 0.3, 0.2], [0.7]]
+
+
+def test_merge_centroid():
+    """Test that near-duplicate detections are merged into their centroid."""
+    merged = merge_detections(DETECTIONS, 0.02)
+
+    assert len(merged) == 3
+    np.testing.assert_allclose(merged[0], [[0.105, 0.10], [0.50, 0.50]])
+
+    # Chained detections form a single cluster
+    np.testing.assert_allclose(merged[1], [[0.20, 0.20], [0.61, 0.61]])
+    np.testing.assert_allclose(merged[2], [[0.30, 0.30]])
+
+
+def test_merge_max_confidence():
+    """Test that each cluster is replaced by its highest confidence detection."""
+    merged = merge_detections(DETECTIONS, 0.02, method='max', confidences=CONFIDENCES)
+
+    assert merged[0] == [[0.11, 0.10], [0.50, 0.50]]
+    assert merged[1] == [[0.20, 0.20], [0.61, 0.61]]
+
+
+def test_spatial_index():
+    """Test that spatial index queries match a brute force search."""
+    merged, index = preprocess(DETECTIONS, 0.001)
+
+    assert merged == DETECTIONS
+    assert len(index) == len(DETECTIONS)
+    for frame_index, frame in enumerate(DETECTIONS):
+        for point in ([0.1, 0.1], [0.6, 0.6], [0.3, 0.3]):
+            for radius in (0.005, 0.02, 0.5):
+                distances = np.linalg.norm(np.asarray(frame) - point, axis=1)
+                expected = np.flatnonzero(distances <= radius)
+                np.testing.assert_array_equal(index.query(frame_index, point, radius), expected)
+
+
+def test_cluster_frame():
+    """Test that clusters match the connected components of a brute force neighbor search."""
+    random_state = np.random.RandomState(0)
+    for dims, radius in ((1, 0.002), (2, 0.05), (3, 0.1), (2, 1e-12), (2, 1e9)):
+        coordinates = random_state.random_sample((300, dims))
+        coordinates[:100:5] = coordinates[1:100:5]  # Exact duplicates
+
+        # Propagate the minimum label over the dense adjacency matrix
+        offsets = coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :]
+        adjacency = (offsets ** 2).sum(axis=2) <= radius ** 2
+        expected = np.arange(len(coordinates))
+        while True:
+            labels = np.where(adjacency, expected[np.newaxis, :], len(coordinates)).min(axis=1)
+            if np.array_equal(labels, expected):
+                break
+
+            expected = labels
+
+        np.testing.assert_array_equal(cluster_frame(coordinates, radius), expected)
+
+    # A long chain of detections forms a single cluster
+    chain = np.column_stack((np.arange(2000) * 1e-3, np.zeros(2000)))
+    assert (cluster_frame(chain, 1.5e-3) == 0).all()
+
+
+def test_radius_must_be_positive():
+    """Test that merging and indexing both reject a zero radius."""
+    for radius in (0., -1.):
+        with pytest.raises(AssertionError, match="must be positive"):
+            merge_detections(DETECTIONS, radius)
+
+        with pytest.raises(AssertionError, match="must be positive"):
+            preprocess(DETECTIONS, radius)
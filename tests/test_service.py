@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from openmht import cli
+from openmht.mht import MHT
+from openmht.service import TrackingService
+
+
+ROOT_DIR = str(Path(__file__).parent.parent)
+TEST_FILE_PATH = os.path.join(ROOT_DIR, "SampleData", "SampleInput.csv")
+PARAM_FILE_PATH = os.path.join(ROOT_DIR, "params.txt")
+
+
+async def send(writer, message):
+    writer.write((json.dumps(message) + '\n').encode())
+    await writer.drain()
+
+
+async def receive(reader):
+    return json.loads(await reader.readline())
+
+
+async def track_streams(detections, params, stream_names):
+    """Feed the detections to each stream and collect the published frames."""
+    service = TrackingService(params, workers=2)
+    server = await asyncio.start_server(service.handle_client, host='127.0.0.1', port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for name in stream_names:
+            await send(writer, {'op': 'subscribe', 'stream': name})
+
+        for frame in detections:
+            for name in stream_names:
+                await send(writer, {'op': 'frame', 'stream': name, 'detections': frame})
+
+        await send(writer, {'op': 'stats'})
+        published = {name: {} for name in stream_names}
+        closed = set()
+        stats = None
+        for name in stream_names:
+            await send(writer, {'op': 'close', 'stream': name})
+
+        while len(closed) < len(stream_names):
+            message = await receive(reader)
+            if message['op'] == 'tracks':
+                published[message['stream']][message['frame']] = message['tracks']
+            elif message['op'] == 'stats':
+                stats = message['streams']
+            elif message['op'] == 'closed':
+                assert message['frames'] == len(detections)
+                closed.add(message['stream'])
+            else:
+                raise AssertionError(message)
+
+        writer.close()
+        return published, stats
+
+    finally:
+        server.close()
+        await service.shutdown()
+
+
+def test_service():
+    """Test that each stream publishes the frames of the MHT solution with stable track IDs."""
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    mht = MHT(detections, params)
+    mht.run()
+    stream_names = ['cam1', 'cam2', 'cam3']
+
+    published, stats = asyncio.run(track_streams(detections, params, stream_names))
+
+    assert set(stats) == set(stream_names)
+    assert all({'frames', 'queue_depth', 'latency_mean', 'latency_max'} <= set(s) for s in stats.values())
+
+    # Every frame, including those committed before the last frame, matches the solution
+    # of an uninterrupted run, with each track published under the same ID in every frame
+    solution_detections = mht.get_solution_detections()
+    coordinates = mht.get_detection_coordinates()
+    for name in stream_names:
+        assert sorted(published[name]) == list(range(len(detections)))
+        for frame_index, rows in published[name].items():
+            expected = sorted([track_id] + coordinates[detection_id].tolist()
+                              for track_id, detection_id in zip(mht.get_solution_track_ids().tolist(),
+                                                                solution_detections[:, frame_index].tolist())
+                              if detection_id >= 0)
+            assert rows == expected
+
+    # Rows of a track are linked across frames by its ID
+    track_ids = {row[0] for rows in published['cam1'].values() for row in rows}
+    assert len(track_ids) == len(solution_detections)
+
+
+def test_close_while_opening():
+    """Test closing a stream while it is still being opened."""
+    async def open_and_close(params):
+        service = TrackingService(params, workers=1)
+        try:
+            submitted = asyncio.create_task(service.submit('cam1', [[0.1, 0.2]]))
+            await asyncio.sleep(0)  # The stream is registered, and its tracker is being created
+            frames = await service.close_stream('cam1')
+            await submitted
+            return frames
+        finally:
+            await service.shutdown()
+
+    params = cli.read_parameters(PARAM_FILE_PATH)
+    assert asyncio.run(open_and_close(params)) == 0
@@ -0,0 +1,86 @@
+import atexit
+import logging
+import os
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from openmht import cli, sweep
+from openmht.mht import MHT
+
+
+ROOT_DIR = str(Path(__file__).parent.parent)
+TEST_DATA_PATH = os.path.join(ROOT_DIR, "SampleData")
+TEST_FILE_PATH = os.path.join(TEST_DATA_PATH, "SampleInput.csv")
+PARAM_FILE_PATH = os.path.join(ROOT_DIR, "params.txt")
+TRUTH_FILE_PATH = os.path.join(TEST_DATA_PATH, "SampleOutput.csv")
+
+
+def test_parse_range():
+    """Test parsing parameter ranges."""
+    assert sweep.parse_range("500,1000") == [500., 1000.]
+    assert sweep.parse_range("1:3:1") == [1., 2., 3.]
+    assert sweep.parse_range("0.5:0.9:0.2") == pytest.approx([0.5, 0.7, 0.9])
+    with pytest.raises(ValueError):
+        sweep.parse_range("1:3:0")
+
+
+def test_read_track_csv():
+    """Test that the ground truth tracks match the MHT solution on the sample data."""
+    solution = MHT(cli.read_uv_csv(TEST_FILE_PATH), cli.read_parameters(PARAM_FILE_PATH)).run()
+    truth = sweep.read_track_csv(TRUTH_FILE_PATH)
+
+    assert truth == solution
+    assert sweep.score_links(sweep.track_links(solution), sweep.track_links(truth)) == (1., 1., 1.)
+
+
+def test_sweep(tmp_path):
+    """Test that the sweep ranks the parameter settings by accuracy."""
+    result_file = str(tmp_path / "results.csv")
+    results = sweep.run([TEST_FILE_PATH, PARAM_FILE_PATH, TRUTH_FILE_PATH, "--dth", "10,1000",
+                         "--pd", "0.9", "-j", "2", "-o", result_file])
+
+    assert len(results) == 2
+    params, f1 = results[0][:2]
+    assert params["dth"] == 1000 and f1 == 1.
+    assert results[1][1] < 1.
+
+    with open(result_file, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    assert lines[0] == "rank,f1,precision,recall,seconds,dth,pd"
+    assert len(lines) == 3
+
+
+def test_worker_detections():
+    """Test that the worker detections are views of the shared memory blocks."""
+    detections = cli.read_uv_csv(TEST_FILE_PATH)
+    offsets = np.cumsum([0] + [len(frame) for frame in detections])
+    coordinates = np.array([coordinate for frame in detections for coordinate in frame])
+    coordinates_memory = shared_memory.SharedMemory(create=True, size=coordinates.nbytes)
+    offsets_memory = shared_memory.SharedMemory(create=True, size=offsets.nbytes)
+    root_level = logging.getLogger().level
+    try:
+        shared_coordinates = np.ndarray(coordinates.shape, dtype=np.float64, buffer=coordinates_memory.buf)
+        shared_coordinates[:] = coordinates
+        np.ndarray(offsets.shape, dtype=np.int64, buffer=offsets_memory.buf)[:] = offsets
+        sweep._init_worker(coordinates_memory.name, offsets_memory.name, coordinates.shape, len(detections), set())
+        assert [frame.tolist() for frame in sweep._detections] == detections
+
+        # Writes to the shared block are seen by the worker views
+        shared_coordinates[0, 0] = -1.
+        assert sweep._detections[0][0, 0] == -1.
+
+        del shared_coordinates
+        sweep._close_worker()
+
+    finally:
+        # Undo the worker setup in the test process
+        atexit.unregister(sweep._close_worker)
+        logging.getLogger().setLevel(root_level)
+        coordinates_memory.close()
+        coordinates_memory.unlink()
+        offsets_memory.close()
+        offsets_memory.unlink()